@@ -0,0 +1,25 @@
+"""
+Storage backends for saki-doruma expense data.
+"""
+
+from .base import GroupCommitter, StorageBackend
+from .json_file import JsonFileBackend
+from .journal import JournalBackend
+from .partitioned import PartitionedBackend
+from .sqlite import SqliteBackend, migrate_json_to_sqlite
+
+BACKENDS = {
+    JsonFileBackend.name: JsonFileBackend,
+    JournalBackend.name: JournalBackend,
+    SqliteBackend.name: SqliteBackend,
+    PartitionedBackend.name: PartitionedBackend,
+}
+
+
+def create_backend(name: str, data_dir, **options) -> StorageBackend:
+    """Create a storage backend by name, passing options to its constructor."""
+    try:
+        backend_cls = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown storage backend: {name}") from None
+    return backend_cls(data_dir, **options)
@@ -0,0 +1,284 @@
+"""
+Base class and helpers shared by the storage backends.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional
+
+
+def save_json(filepath: Path, data: any) -> None:
+    """Save data to JSON file atomically.
+
+    The data is written to a temporary file in the same directory, synced
+    to disk and renamed over the target, so a crash leaves either the old
+    or the new file and never a truncated one.
+    """
+    filepath = Path(filepath)
+    fd, tmp_path = tempfile.mkstemp(dir=filepath.parent, prefix=filepath.name + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_directory(filepath.parent)
+
+
+def iter_json_array(filepath: Path, chunk_size: int = 1 << 16) -> Iterator[any]:
+    """Yield the elements of a JSON array file one at a time.
+
+    The file is read in chunks and each element is decoded as soon as it is
+    complete, so memory use depends on the largest element rather than on
+    the size of the file.
+    """
+    decoder = json.JSONDecoder()
+    with open(filepath, 'r', encoding='utf-8') as f:
+        buffer = ''
+        pos = 0
+        eof = False
+        expect_value = True
+
+        def skip_whitespace() -> None:
+            nonlocal pos
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n':
+                pos += 1
+
+        def read_more() -> None:
+            nonlocal buffer, pos, eof
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+        while True:
+            skip_whitespace()
+            if pos < len(buffer) or eof:
+                break
+            read_more()
+        if eof and pos >= len(buffer):
+            return
+        if buffer[pos] != '[':
+            raise ValueError(f"Expected a JSON array in {filepath}")
+        pos += 1
+
+        while True:
+            skip_whitespace()
+            if pos >= len(buffer):
+                if eof:
+                    raise ValueError(f"Unterminated JSON array in {filepath}")
+                read_more()
+                continue
+            if buffer[pos] == ']':
+                return
+            if not expect_value:
+                if buffer[pos] != ',':
+                    raise ValueError(f"Expected ',' at offset {pos} in {filepath}")
+                pos += 1
+                expect_value = True
+                continue
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                read_more()
+                continue
+            if end >= len(buffer) and not eof:
+                # The value may continue in the next chunk (e.g. a number).
+                read_more()
+                continue
+            pos = end
+            expect_value = False
+            yield value
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Make a rename in the directory durable where the OS supports it."""
+    if os.name != 'posix':
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def load_json(filepath: Path) -> any:
+    """Load data from JSON file."""
+    if not filepath.exists():
+        return None
+    with open(filepath, 'r') as f:
+        return json.load(f)
+
+
+class GroupCommitter:
+    """Coalesces flush requests that arrive within a short window.
+
+    With a delay of zero every request flushes immediately. Otherwise the
+    first request starts a timer and the requests that follow before it
+    fires share the same flush.
+    """
+
+    def __init__(self, flush: Callable[[], None], delay: float = 0.0):
+        """Initialize group committer."""
+        self._flush = flush
+        self.delay = delay
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> bool:
+        """Whether a flush is waiting for its window to close."""
+        return self._timer is not None
+
+    def request(self) -> None:
+        """Ask for a flush, either now or at the end of the window."""
+        if self.delay <= 0:
+            self._flush()
+            return
+        with self._lock:
+            if self._timer is None:
+                self._timer = threading.Timer(self.delay, self._run)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush_now(self) -> None:
+        """Cancel the pending window and flush immediately."""
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+        self._flush()
+
+    def _run(self) -> None:
+        """Flush when the window closes."""
+        with self._lock:
+            if self._timer is None:
+                return
+            self._timer = None
+        try:
+            self._flush()
+        except Exception as e:
+            print(f"Error during group commit: {e}")
+
+
+class StorageBackend:
+    """Interface for engines that persist expense records.
+
+    Records are plain dictionaries in the ``Expense.to_dict`` format. Lists
+    returned by ``load_expenses`` may share their dictionaries with the
+    backend, so callers must copy a record before changing it. The query
+    methods scan ``load_expenses``; backends with real indexes override them.
+    Reports are kept in ``reports.json`` unless a backend overrides that too.
+    """
+
+    name = "base"
+
+    def __init__(self, data_dir: Path):
+        """Initialize storage backend."""
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.reports_file = self.data_dir / "reports.json"
+        # Signature the backend's own last flush left, and a callback run
+        # with no arguments after held-back writes reach disk
+        self.flushed_signature: Optional[list] = None
+        self.on_flush: Optional[Callable[[], None]] = None
+
+    def load_expenses(self) -> List[dict]:
+        """Load all expense records."""
+        raise NotImplementedError
+
+    def iter_expenses(self) -> Iterator[dict]:
+        """Yield expense records one at a time."""
+        return iter(self.load_expenses())
+
+    def iter_by_date_range(self, start_date: datetime, end_date: datetime) -> Iterator[dict]:
+        """Yield expense records dated within an inclusive range."""
+        for expense in self.iter_expenses():
+            if start_date <= datetime.fromisoformat(expense['date']) <= end_date:
+                yield expense
+
+    def find_expense(self, expense_id: str) -> Optional[dict]:
+        """Get a copy of one expense record by ID."""
+        record = next((e for e in self.load_expenses() if e['id'] == expense_id), None)
+        return dict(record) if record is not None else None
+
+    def find_by_category(self, category: str) -> List[dict]:
+        """Get expense records with the given category value."""
+        return [e for e in self.load_expenses() if e['category'] == category]
+
+    def find_by_date_range(self, start_date: datetime, end_date: datetime) -> List[dict]:
+        """Get expense records dated within an inclusive range."""
+        filtered = []
+        for expense in self.load_expenses():
+            exp_date = datetime.fromisoformat(expense['date'])
+            if start_date <= exp_date <= end_date:
+                filtered.append(expense)
+        return filtered
+
+    def put_expense(self, record: dict) -> None:
+        """Insert or replace an expense record."""
+        raise NotImplementedError
+
+    def delete_expense(self, expense_id: str) -> None:
+        """Remove an expense record if it exists."""
+        raise NotImplementedError
+
+    def put_expenses(self, records: List[dict]) -> None:
+        """Insert or replace many expense records."""
+        for record in records:
+            self.put_expense(record)
+
+    def delete_expenses(self, expense_ids: Iterable[str]) -> List[str]:
+        """Remove many expense records and return the IDs that existed."""
+        existing = {e['id'] for e in self.load_expenses()}
+        deleted = [i for i in dict.fromkeys(expense_ids) if i in existing]
+        for expense_id in deleted:
+            self.delete_expense(expense_id)
+        return deleted
+
+    def load_reports(self) -> List[dict]:
+        """Load all report records."""
+        return load_json(self.reports_file) or []
+
+    def put_report(self, report: dict) -> None:
+        """Insert or replace a report record."""
+        reports = self.load_reports()
+        existing_idx = next((i for i, r in enumerate(reports) if r['report_id'] == report['report_id']), None)
+        if existing_idx is not None:
+            reports[existing_idx] = report
+        else:
+            reports.append(report)
+        save_json(self.reports_file, reports)
+
+    def delete_report(self, report_id: str) -> None:
+        """Remove a report record if it exists."""
+        reports = [r for r in self.load_reports() if r['report_id'] != report_id]
+        save_json(self.reports_file, reports)
+
+    def signature(self) -> Optional[list]:
+        """Get a value that changes whenever the stored expenses change.
+
+        Derived data such as the columnar snapshot is only reused while the
+        signature stays the same. ``None`` means the state is unknown.
+        """
+        return None
+
+    def flush(self) -> None:
+        """Write out any changes still held in memory."""
+
+    def close(self) -> None:
+        """Flush pending changes and release any open file handles."""
+        self.flush()
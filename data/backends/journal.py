@@ -0,0 +1,175 @@
+"""
+Append-only journal storage backend.
+
+The ledger lives in two files: ``expenses.json`` holds a snapshot in the
+same format the JSON backend uses, and ``expenses.journal`` holds one JSON
+line per change made since that snapshot was written. Saving or deleting
+an expense appends a single line, so its cost does not depend on the size
+of the ledger. Opening the store loads the snapshot and replays the journal.
+
+Once the journal holds more entries than the ledger has records it is
+folded back into the snapshot, which keeps replay time proportional to the
+ledger size. Replaying an entry twice is harmless, so a crash between
+writing the snapshot and truncating the journal loses nothing.
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+from ..indexes import DateIndex
+from .base import StorageBackend, load_json, save_json
+
+
+class JournalBackend(StorageBackend):
+    """Stores expenses as a snapshot plus an append-only change journal."""
+
+    name = "journal"
+
+    def __init__(self, data_dir, compact_threshold: int = 1000, fsync: bool = False):
+        """Initialize journal backend and replay the existing journal."""
+        super().__init__(data_dir)
+        self.snapshot_file = self.data_dir / "expenses.json"
+        self.journal_file = self.data_dir / "expenses.journal"
+        self.compact_threshold = compact_threshold
+        self.fsync = fsync
+        self._records: Dict[str, dict] = {}
+        self._date_index: Optional[DateIndex] = None
+        self._journal_entries = 0
+        self._journal_offset = 0
+        self._snapshot_mtime = None
+        if not self.snapshot_file.exists():
+            save_json(self.snapshot_file, [])
+        self._load()
+
+    def _load(self) -> None:
+        """Load the snapshot and replay the whole journal."""
+        self._snapshot_mtime = self.snapshot_file.stat().st_mtime_ns
+        self._records = {e['id']: e for e in load_json(self.snapshot_file) or []}
+        self._date_index = None
+        self._journal_entries = 0
+        self._journal_offset = 0
+        self._replay_tail()
+
+    def _replay_tail(self) -> None:
+        """Apply journal entries written after the last known offset."""
+        if not self.journal_file.exists():
+            return
+        with open(self.journal_file, 'rb') as f:
+            f.seek(self._journal_offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # Torn write from an interrupted append; ignore it.
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                self._apply(entry)
+                self._journal_entries += 1
+                self._journal_offset += len(line)
+
+    def _apply(self, entry: dict) -> None:
+        """Apply one journal entry to the in-memory records."""
+        if entry['op'] == 'put':
+            record = entry['record']
+            self._records[record['id']] = record
+            if self._date_index is not None:
+                self._date_index.add(record)
+        elif entry['op'] == 'delete':
+            self._records.pop(entry['id'], None)
+            if self._date_index is not None:
+                self._date_index.remove(entry['id'])
+
+    def _refresh(self) -> None:
+        """Pick up changes written by other instances on the same files."""
+        try:
+            snapshot_mtime = self.snapshot_file.stat().st_mtime_ns
+        except FileNotFoundError:
+            snapshot_mtime = None
+        if snapshot_mtime != self._snapshot_mtime:
+            self._load()
+            return
+        try:
+            journal_size = self.journal_file.stat().st_size
+        except FileNotFoundError:
+            journal_size = 0
+        if journal_size < self._journal_offset:
+            self._load()
+        elif journal_size > self._journal_offset:
+            self._replay_tail()
+
+    def _append(self, entries: List[dict]) -> None:
+        """Append entries to the journal in one write and apply them."""
+        lines = [(json.dumps(e, separators=(',', ':'), default=str) + '\n').encode('utf-8') for e in entries]
+        with open(self.journal_file, 'ab') as f:
+            f.seek(self._journal_offset)
+            f.truncate()
+            f.write(b''.join(lines))
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        for entry, line in zip(entries, lines):
+            self._apply(entry)
+            self._journal_entries += 1
+            self._journal_offset += len(line)
+        if self._journal_entries >= max(self.compact_threshold, len(self._records)):
+            self.compact()
+
+    def compact(self) -> None:
+        """Fold the journal into a fresh snapshot and truncate it."""
+        save_json(self.snapshot_file, list(self._records.values()))
+        with open(self.journal_file, 'wb'):
+            pass
+        self._snapshot_mtime = self.snapshot_file.stat().st_mtime_ns
+        self._journal_entries = 0
+        self._journal_offset = 0
+
+    def signature(self) -> Optional[list]:
+        """Get the snapshot mtime and the journal offset."""
+        self._refresh()
+        return [self._snapshot_mtime, self._journal_offset]
+
+    def load_expenses(self) -> List[dict]:
+        """Load all expense records."""
+        self._refresh()
+        return list(self._records.values())
+
+    def find_expense(self, expense_id: str) -> Optional[dict]:
+        """Get a copy of one expense record by ID."""
+        self._refresh()
+        record = self._records.get(expense_id)
+        return dict(record) if record is not None else None
+
+    def find_by_date_range(self, start_date: datetime, end_date: datetime) -> List[dict]:
+        """Get expense records dated within an inclusive range, in date order."""
+        self._refresh()
+        if self._date_index is None:
+            self._date_index = DateIndex(self._records.values())
+        return [self._records[i] for i in self._date_index.ids_between(start_date, end_date)]
+
+    def iter_by_date_range(self, start_date: datetime, end_date: datetime) -> Iterator[dict]:
+        """Yield expense records dated within an inclusive range, in date order."""
+        return iter(self.find_by_date_range(start_date, end_date))
+
+    def put_expense(self, record: dict) -> None:
+        """Insert or replace an expense record."""
+        self.put_expenses([record])
+
+    def put_expenses(self, records: List[dict]) -> None:
+        """Insert or replace many expense records with one journal write."""
+        self._refresh()
+        if records:
+            self._append([{'op': 'put', 'record': r} for r in records])
+
+    def delete_expense(self, expense_id: str) -> None:
+        """Remove an expense record if it exists."""
+        self.delete_expenses([expense_id])
+
+    def delete_expenses(self, expense_ids: Iterable[str]) -> List[str]:
+        """Remove many expense records with one journal write."""
+        self._refresh()
+        deleted = [i for i in dict.fromkeys(expense_ids) if i in self._records]
+        if deleted:
+            self._append([{'op': 'delete', 'id': i} for i in deleted])
+        return deleted
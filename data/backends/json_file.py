@@ -0,0 +1,184 @@
+"""
+Whole-file JSON storage backend.
+"""
+
+import atexit
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+from ..indexes import DateIndex
+from .base import GroupCommitter, StorageBackend, iter_json_array, load_json, save_json
+
+
+class JsonFileBackend(StorageBackend):
+    """Stores every expense in a single JSON array, rewritten on each change.
+
+    The parsed array is cached in memory together with the file's mtime and
+    size, and the file is only parsed again when either of them changes. A
+    date index is built on the first range query and kept current on writes.
+
+    With a ``commit_delay`` the file is not rewritten on every change:
+    changes made within the delay are applied in memory and written out
+    together, and any still pending are written when the process exits.
+    """
+
+    name = "json"
+
+    def __init__(self, data_dir, commit_delay: float = 0.0):
+        """Initialize JSON file backend."""
+        super().__init__(data_dir)
+        self.expenses_file = self.data_dir / "expenses.json"
+        self._expenses: List[dict] = []
+        self._positions: Dict[str, int] = {}
+        self._date_index: Optional[DateIndex] = None
+        self._signature = None
+        self._dirty = False
+        self._lock = threading.RLock()
+        self._committer = GroupCommitter(self.flush, commit_delay)
+        if commit_delay > 0:
+            atexit.register(self.flush)
+        if not self.expenses_file.exists():
+            save_json(self.expenses_file, [])
+
+    def _file_signature(self) -> Optional[tuple]:
+        """Get the (mtime, size) pair used to validate the cache."""
+        try:
+            stat = self.expenses_file.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _refresh(self) -> None:
+        """Re-parse the file if it changed since it was last read."""
+        if self._dirty:
+            # Unflushed changes in memory are newer than the file.
+            return
+        signature = self._file_signature()
+        if signature != self._signature:
+            self._expenses = load_json(self.expenses_file) or []
+            self._positions = {e['id']: i for i, e in enumerate(self._expenses)}
+            self._date_index = None
+            self._signature = signature
+
+    def _write(self) -> None:
+        """Write the cached records back to the file."""
+        try:
+            save_json(self.expenses_file, self._expenses)
+        except Exception:
+            # Force a re-read so the cache never drifts from the file.
+            self._signature = None
+            raise
+        self._signature = self._file_signature()
+
+    def signature(self) -> Optional[list]:
+        """Get the file's mtime and size, or None while changes are unflushed."""
+        with self._lock:
+            if self._dirty:
+                return None
+            signature = self._file_signature()
+            return list(signature) if signature else None
+
+    def flush(self) -> None:
+        """Write out changes held back by group commit and notify ``on_flush``."""
+        with self._lock:
+            if not self._dirty:
+                return
+            # Stay dirty until the write lands so a failed write keeps
+            # the changes in memory for the next flush.
+            self._write()
+            self._dirty = False
+            self.flushed_signature = list(self._signature) if self._signature else None
+        # Outside the lock: the listener may take locks held around writes
+        if self.on_flush is not None:
+            self.on_flush()
+
+    def close(self) -> None:
+        """Write out pending changes immediately."""
+        self._committer.flush_now()
+
+    def load_expenses(self) -> List[dict]:
+        """Load all expense records."""
+        with self._lock:
+            self._refresh()
+            return list(self._expenses)
+
+    def _is_cached(self) -> bool:
+        """Whether the in-memory array matches the file."""
+        return self._dirty or self._signature == self._file_signature()
+
+    def iter_expenses(self) -> Iterator[dict]:
+        """Yield expense records, streaming them from disk if not cached."""
+        with self._lock:
+            if self._is_cached():
+                return iter(list(self._expenses))
+        return iter_json_array(self.expenses_file)
+
+    def iter_by_date_range(self, start_date: datetime, end_date: datetime) -> Iterator[dict]:
+        """Yield expense records dated within an inclusive range."""
+        with self._lock:
+            if self._is_cached():
+                return iter(self.find_by_date_range(start_date, end_date))
+        return super().iter_by_date_range(start_date, end_date)
+
+    def find_expense(self, expense_id: str) -> Optional[dict]:
+        """Get a copy of one expense record by ID."""
+        with self._lock:
+            self._refresh()
+            idx = self._positions.get(expense_id)
+            return dict(self._expenses[idx]) if idx is not None else None
+
+    def find_by_date_range(self, start_date: datetime, end_date: datetime) -> List[dict]:
+        """Get expense records dated within an inclusive range, in date order."""
+        with self._lock:
+            self._refresh()
+            if self._date_index is None:
+                self._date_index = DateIndex(self._expenses)
+            ids = self._date_index.ids_between(start_date, end_date)
+            return [self._expenses[self._positions[i]] for i in ids]
+
+    def _merge(self, record: dict) -> None:
+        """Insert or replace a record in the cached array."""
+        existing_idx = self._positions.get(record['id'])
+        if existing_idx is not None:
+            self._expenses[existing_idx] = record
+        else:
+            self._positions[record['id']] = len(self._expenses)
+            self._expenses.append(record)
+        if self._date_index is not None:
+            self._date_index.add(record)
+
+    def put_expense(self, record: dict) -> None:
+        """Insert or replace an expense record."""
+        self.put_expenses([record])
+
+    def put_expenses(self, records: List[dict]) -> None:
+        """Insert or replace many expense records with one file write."""
+        if not records:
+            return
+        with self._lock:
+            self._refresh()
+            for record in records:
+                self._merge(record)
+            self._dirty = True
+        self._committer.request()
+
+    def delete_expense(self, expense_id: str) -> None:
+        """Remove an expense record if it exists."""
+        self.delete_expenses([expense_id])
+
+    def delete_expenses(self, expense_ids: Iterable[str]) -> List[str]:
+        """Remove many expense records with one file write."""
+        with self._lock:
+            self._refresh()
+            deleted = [i for i in dict.fromkeys(expense_ids) if i in self._positions]
+            if not deleted:
+                return deleted
+            removed = set(deleted)
+            self._expenses = [e for e in self._expenses if e['id'] not in removed]
+            self._positions = {e['id']: i for i, e in enumerate(self._expenses)}
+            if self._date_index is not None:
+                for expense_id in deleted:
+                    self._date_index.remove(expense_id)
+            self._dirty = True
+        self._committer.request()
+        return deleted
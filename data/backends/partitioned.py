@@ -0,0 +1,294 @@
+"""
+Month-partitioned storage backend.
+
+Expenses are sharded into one JSON file per ``YYYY-MM`` under a
+``partitions`` directory. Two small files sit next to them:
+
+* ``manifest.json`` lists the partitions and how many records each holds.
+* ``locator.log`` is an append-only log of ``[id, month]`` lines recording
+  which partition each expense lives in (``month`` is null once deleted).
+
+Date-range reads open only the partitions the range overlaps, an edit
+rewrites only the partitions it touches, and looking an expense up by ID
+reads the locator rather than every partition, so old months are never
+parsed during day-to-day use.
+"""
+
+import json
+import os
+import tempfile
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+from ..indexes import date_key
+from .base import StorageBackend, iter_json_array, load_json, save_json
+
+
+def partition_key(value) -> str:
+    """Get the ``YYYY-MM`` partition for a datetime or ISO date string."""
+    if isinstance(value, str):
+        return value[:7]
+    return f"{value.year:04d}-{value.month:02d}"
+
+
+class _Partition:
+    """Cached contents of one partition file."""
+
+    def __init__(self, path):
+        """Initialize an unloaded partition."""
+        self.path = path
+        self.records: List[dict] = []
+        self.positions: Dict[str, int] = {}
+        self.signature = None
+
+    def _file_signature(self) -> Optional[tuple]:
+        """Get the (mtime, size) pair used to validate the cache."""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def load(self) -> List[dict]:
+        """Get the partition's records, re-reading the file if it changed."""
+        signature = self._file_signature()
+        if signature != self.signature:
+            self.records = load_json(self.path) or []
+            self.positions = {e['id']: i for i, e in enumerate(self.records)}
+            self.signature = signature
+        return self.records
+
+    def iter_records(self) -> Iterator[dict]:
+        """Yield records from the cache if it is current, else from disk."""
+        if self.signature is not None and self.signature == self._file_signature():
+            return iter(list(self.records))
+        if not self.path.exists():
+            return iter(())
+        return iter_json_array(self.path)
+
+    def save(self) -> None:
+        """Write the partition, removing the file once it is empty."""
+        if self.records:
+            save_json(self.path, self.records)
+        elif self.path.exists():
+            self.path.unlink()
+        self.signature = self._file_signature()
+
+
+class PartitionedBackend(StorageBackend):
+    """Stores expenses in one file per calendar month."""
+
+    name = "partitioned"
+
+    def __init__(self, data_dir, compact_threshold: int = 1000):
+        """Initialize partitioned backend, splitting expenses.json on first use."""
+        super().__init__(data_dir)
+        self.partitions_dir = self.data_dir / "partitions"
+        self.manifest_file = self.partitions_dir / "manifest.json"
+        self.locator_file = self.partitions_dir / "locator.log"
+        self.compact_threshold = compact_threshold
+        self._partitions: Dict[str, _Partition] = {}
+        self._manifest: Dict[str, dict] = {}
+        self._manifest_mtime = None
+        self._locations: Dict[str, str] = {}
+        self._locator_offset = 0
+        self._locator_entries = 0
+        is_new = not self.manifest_file.exists()
+        self.partitions_dir.mkdir(exist_ok=True)
+        if is_new:
+            self._save_manifest()
+            self.put_expenses(load_json(self.data_dir / "expenses.json") or [])
+        self._refresh()
+
+    def _partition(self, month: str) -> _Partition:
+        """Get the cache entry for a partition."""
+        if month not in self._partitions:
+            self._partitions[month] = _Partition(self.partitions_dir / f"{month}.json")
+        return self._partitions[month]
+
+    def _save_manifest(self) -> None:
+        """Write the partition manifest."""
+        save_json(self.manifest_file, {'version': 1, 'partitions': self._manifest})
+        self._manifest_mtime = self.manifest_file.stat().st_mtime_ns
+
+    def _refresh(self) -> None:
+        """Pick up changes written by other instances on the same files."""
+        manifest_mtime = self.manifest_file.stat().st_mtime_ns
+        if manifest_mtime != self._manifest_mtime:
+            self._manifest = (load_json(self.manifest_file) or {}).get('partitions', {})
+            self._manifest_mtime = manifest_mtime
+        try:
+            locator_size = self.locator_file.stat().st_size
+        except FileNotFoundError:
+            locator_size = 0
+        if locator_size < self._locator_offset:
+            self._locations = {}
+            self._locator_offset = 0
+            self._locator_entries = 0
+        if locator_size > self._locator_offset:
+            self._read_locator()
+
+    def _read_locator(self) -> None:
+        """Apply locator lines written after the last known offset."""
+        with open(self.locator_file, 'rb') as f:
+            f.seek(self._locator_offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                expense_id, month = json.loads(line)
+                if month is None:
+                    self._locations.pop(expense_id, None)
+                else:
+                    self._locations[expense_id] = month
+                self._locator_entries += 1
+                self._locator_offset += len(line)
+
+    def _append_locator(self, changes: Dict[str, Optional[str]]) -> None:
+        """Record new partition locations, compacting the log when it grows."""
+        if not changes:
+            return
+        for expense_id, month in changes.items():
+            if month is None:
+                self._locations.pop(expense_id, None)
+            else:
+                self._locations[expense_id] = month
+        self._locator_entries += len(changes)
+        if self._locator_entries >= max(self.compact_threshold, 2 * len(self._locations)):
+            self._rewrite_locator()
+            return
+        data = b''.join(
+            (json.dumps([i, m], separators=(',', ':')) + '\n').encode('utf-8') for i, m in changes.items()
+        )
+        with open(self.locator_file, 'ab') as f:
+            f.seek(self._locator_offset)
+            f.truncate()
+            f.write(data)
+        self._locator_offset += len(data)
+
+    def _rewrite_locator(self) -> None:
+        """Replace the locator log with one line per live expense."""
+        data = b''.join(
+            (json.dumps([i, m], separators=(',', ':')) + '\n').encode('utf-8')
+            for i, m in self._locations.items()
+        )
+        fd, tmp_path = tempfile.mkstemp(dir=self.partitions_dir, prefix='locator.', suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.locator_file)
+        self._locator_offset = len(data)
+        self._locator_entries = len(self._locations)
+
+    def _months_between(self, start_date: datetime, end_date: datetime) -> List[str]:
+        """Get the existing partitions that overlap a date range."""
+        first, last = partition_key(start_date), partition_key(end_date)
+        return [m for m in sorted(self._manifest) if first <= m <= last]
+
+    def _write_partitions(self, months: Iterable[str]) -> None:
+        """Save changed partitions and update the manifest."""
+        for month in months:
+            partition = self._partition(month)
+            partition.save()
+            if partition.records:
+                self._manifest[month] = {'count': len(partition.records)}
+            else:
+                self._manifest.pop(month, None)
+        self._save_manifest()
+
+    def signature(self) -> Optional[list]:
+        """Get the manifest mtime and the locator offset."""
+        self._refresh()
+        return [self._manifest_mtime, self._locator_offset]
+
+    def load_expenses(self) -> List[dict]:
+        """Load all expense records, partition by partition."""
+        self._refresh()
+        expenses = []
+        for month in sorted(self._manifest):
+            expenses.extend(self._partition(month).load())
+        return expenses
+
+    def find_expense(self, expense_id: str) -> Optional[dict]:
+        """Get a copy of one expense record by ID."""
+        self._refresh()
+        month = self._locations.get(expense_id)
+        if month is None:
+            return None
+        partition = self._partition(month)
+        partition.load()
+        idx = partition.positions.get(expense_id)
+        return dict(partition.records[idx]) if idx is not None else None
+
+    def iter_expenses(self) -> Iterator[dict]:
+        """Yield expense records one partition at a time."""
+        self._refresh()
+        for month in sorted(self._manifest):
+            yield from self._partition(month).iter_records()
+
+    def find_by_date_range(self, start_date: datetime, end_date: datetime) -> List[dict]:
+        """Get expense records dated within an inclusive range, in date order."""
+        return list(self.iter_by_date_range(start_date, end_date))
+
+    def iter_by_date_range(self, start_date: datetime, end_date: datetime) -> Iterator[dict]:
+        """Yield expense records in a date range, reading only overlapping partitions."""
+        self._refresh()
+        lo, hi = date_key(start_date), date_key(end_date)
+        for month in self._months_between(start_date, end_date):
+            keyed = [(date_key(e['date']), e) for e in self._partition(month).load()]
+            keyed = [(k, e) for k, e in keyed if lo <= k <= hi]
+            keyed.sort(key=lambda p: p[0])
+            yield from (e for _, e in keyed)
+
+    def put_expense(self, record: dict) -> None:
+        """Insert or replace an expense record."""
+        self.put_expenses([record])
+
+    def put_expenses(self, records: List[dict]) -> None:
+        """Insert or replace many records, rewriting each touched partition once."""
+        self._refresh()
+        touched = set()
+        moves: Dict[str, Optional[str]] = {}
+        for record in records:
+            month = partition_key(record['date'])
+            old_month = moves.get(record['id'], self._locations.get(record['id']))
+            if old_month is not None and old_month != month:
+                self._remove_from(old_month, {record['id']})
+                touched.add(old_month)
+            partition = self._partition(month)
+            partition.load()
+            idx = partition.positions.get(record['id'])
+            if idx is not None:
+                partition.records[idx] = record
+            else:
+                partition.positions[record['id']] = len(partition.records)
+                partition.records.append(record)
+            touched.add(month)
+            if old_month != month:
+                moves[record['id']] = month
+        if touched:
+            self._write_partitions(touched)
+        self._append_locator(moves)
+
+    def _remove_from(self, month: str, expense_ids: set) -> None:
+        """Remove records from a cached partition."""
+        partition = self._partition(month)
+        partition.records = [e for e in partition.load() if e['id'] not in expense_ids]
+        partition.positions = {e['id']: i for i, e in enumerate(partition.records)}
+
+    def delete_expense(self, expense_id: str) -> None:
+        """Remove an expense record if it exists."""
+        self.delete_expenses([expense_id])
+
+    def delete_expenses(self, expense_ids: Iterable[str]) -> List[str]:
+        """Remove many records, rewriting each touched partition once."""
+        self._refresh()
+        by_month: Dict[str, set] = {}
+        deleted = [i for i in dict.fromkeys(expense_ids) if i in self._locations]
+        for expense_id in deleted:
+            by_month.setdefault(self._locations[expense_id], set()).add(expense_id)
+        for month, ids in by_month.items():
+            self._remove_from(month, ids)
+        if by_month:
+            self._write_partitions(by_month)
+        self._append_locator({i: None for i in deleted})
+        return deleted
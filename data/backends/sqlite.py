@@ -0,0 +1,231 @@
+"""
+SQLite storage backend with indexed expense queries.
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+from .base import StorageBackend, load_json
+
+EXPENSE_COLUMNS = (
+    'id', 'description', 'amount', 'category', 'payment_method', 'date',
+    'notes', 'receipt_path', 'is_reimbursable', 'created_at', 'updated_at',
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS expenses (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    description TEXT NOT NULL,
+    amount REAL NOT NULL,
+    category TEXT NOT NULL,
+    payment_method TEXT NOT NULL,
+    date TEXT NOT NULL,
+    date_key TEXT NOT NULL,
+    notes TEXT,
+    receipt_path TEXT,
+    is_reimbursable INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_expenses_date ON expenses (date_key);
+CREATE INDEX IF NOT EXISTS idx_expenses_category ON expenses (category);
+CREATE INDEX IF NOT EXISTS idx_expenses_payment_method ON expenses (payment_method);
+CREATE INDEX IF NOT EXISTS idx_expenses_reimbursable ON expenses (is_reimbursable);
+CREATE TABLE IF NOT EXISTS reports (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    report_id TEXT NOT NULL UNIQUE,
+    body TEXT NOT NULL
+);
+"""
+
+_UPSERT_REPORT = """
+INSERT INTO reports (report_id, body) VALUES (?, ?)
+ON CONFLICT (report_id) DO UPDATE SET body = excluded.body
+"""
+
+_SELECT = f"SELECT {', '.join(EXPENSE_COLUMNS)} FROM expenses"
+
+_UPSERT = f"""
+INSERT INTO expenses ({', '.join(EXPENSE_COLUMNS)}, date_key)
+VALUES ({', '.join('?' * (len(EXPENSE_COLUMNS) + 1))})
+ON CONFLICT (id) DO UPDATE SET
+    {', '.join(f'{c} = excluded.{c}' for c in EXPENSE_COLUMNS[1:])},
+    date_key = excluded.date_key
+"""
+
+
+def _date_key(value) -> str:
+    """Normalize a date or ISO string into a sortable text key."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.isoformat(timespec='microseconds')
+
+
+def _row_to_record(row: tuple) -> dict:
+    """Convert a selected row into an expense record."""
+    record = dict(zip(EXPENSE_COLUMNS, row))
+    record['is_reimbursable'] = bool(record['is_reimbursable'])
+    return record
+
+
+def _record_params(record: dict) -> tuple:
+    """Build upsert parameters for an expense record."""
+    values = [record.get(c) for c in EXPENSE_COLUMNS]
+    values[EXPENSE_COLUMNS.index('is_reimbursable')] = int(bool(record.get('is_reimbursable')))
+    return (*values, _date_key(record['date']))
+
+
+class SqliteBackend(StorageBackend):
+    """Stores expenses and reports in an indexed SQLite database."""
+
+    name = "sqlite"
+
+    def __init__(self, data_dir, db_name: str = "expenses.db", migrate: bool = True):
+        """Initialize SQLite backend, migrating JSON data on first use."""
+        super().__init__(data_dir)
+        self.db_file = self.data_dir / db_name
+        is_new = not self.db_file.exists()
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_file), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        if is_new and migrate:
+            self.import_json(self.data_dir / "expenses.json", self.reports_file)
+
+    def _stream(self, sql: str, params: tuple = (), batch_size: int = 1000) -> Iterator[dict]:
+        """Yield selected expense records in batches from a cursor."""
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+        try:
+            while True:
+                with self._lock:
+                    rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                for row in rows:
+                    yield _row_to_record(row)
+        finally:
+            cursor.close()
+
+    def _query(self, sql: str, params: tuple = ()) -> List[dict]:
+        """Run a select against the expenses table."""
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [_row_to_record(row) for row in rows]
+
+    def import_json(self, expenses_file: Path, reports_file: Path) -> dict:
+        """Copy records from the JSON files in a single transaction."""
+        expenses = load_json(expenses_file) or []
+        reports = load_json(reports_file) or []
+        with self._lock, self._conn:
+            self._conn.executemany(_UPSERT, (_record_params(e) for e in expenses))
+            self._conn.executemany(
+                _UPSERT_REPORT,
+                ((r['report_id'], json.dumps(r, default=str)) for r in reports),
+            )
+        return {'expenses': len(expenses), 'reports': len(reports)}
+
+    def signature(self) -> Optional[list]:
+        """Get the mtimes and sizes of the database and its write-ahead log."""
+        signature = []
+        for path in (self.db_file, self.db_file.with_name(self.db_file.name + '-wal')):
+            try:
+                stat = path.stat()
+                signature.extend([stat.st_mtime_ns, stat.st_size])
+            except FileNotFoundError:
+                signature.extend([None, None])
+        return signature
+
+    def load_expenses(self) -> List[dict]:
+        """Load all expense records."""
+        return self._query(f"{_SELECT} ORDER BY seq")
+
+    def iter_expenses(self) -> Iterator[dict]:
+        """Yield expense records straight from a database cursor."""
+        return self._stream(f"{_SELECT} ORDER BY seq")
+
+    def iter_by_date_range(self, start_date: datetime, end_date: datetime) -> Iterator[dict]:
+        """Yield expense records dated within an inclusive range, in date order."""
+        return self._stream(
+            f"{_SELECT} WHERE date_key BETWEEN ? AND ? ORDER BY date_key, seq",
+            (_date_key(start_date), _date_key(end_date)),
+        )
+
+    def find_expense(self, expense_id: str) -> Optional[dict]:
+        """Get one expense record by ID."""
+        rows = self._query(f"{_SELECT} WHERE id = ?", (expense_id,))
+        return rows[0] if rows else None
+
+    def find_by_category(self, category: str) -> List[dict]:
+        """Get expense records with the given category value."""
+        return self._query(f"{_SELECT} WHERE category = ? ORDER BY seq", (category,))
+
+    def find_by_date_range(self, start_date: datetime, end_date: datetime) -> List[dict]:
+        """Get expense records dated within an inclusive range, in date order."""
+        return self._query(
+            f"{_SELECT} WHERE date_key BETWEEN ? AND ? ORDER BY date_key, seq",
+            (_date_key(start_date), _date_key(end_date)),
+        )
+
+    def put_expense(self, record: dict) -> None:
+        """Insert or replace an expense record."""
+        with self._lock, self._conn:
+            self._conn.execute(_UPSERT, _record_params(record))
+
+    def delete_expense(self, expense_id: str) -> None:
+        """Remove an expense record if it exists."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM expenses WHERE id = ?", (expense_id,))
+
+    def put_expenses(self, records: List[dict]) -> None:
+        """Insert or replace many expense records in one transaction."""
+        with self._lock, self._conn:
+            self._conn.executemany(_UPSERT, (_record_params(r) for r in records))
+
+    def delete_expenses(self, expense_ids: Iterable[str]) -> List[str]:
+        """Remove many expense records in one transaction."""
+        deleted = []
+        with self._lock, self._conn:
+            for expense_id in dict.fromkeys(expense_ids):
+                cursor = self._conn.execute("DELETE FROM expenses WHERE id = ?", (expense_id,))
+                if cursor.rowcount:
+                    deleted.append(expense_id)
+        return deleted
+
+    def load_reports(self) -> List[dict]:
+        """Load all report records."""
+        with self._lock:
+            rows = self._conn.execute("SELECT body FROM reports ORDER BY seq").fetchall()
+        return [json.loads(body) for body, in rows]
+
+    def put_report(self, report: dict) -> None:
+        """Insert or replace a report record."""
+        with self._lock, self._conn:
+            self._conn.execute(_UPSERT_REPORT, (report['report_id'], json.dumps(report, default=str)))
+
+    def delete_report(self, report_id: str) -> None:
+        """Remove a report record if it exists."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM reports WHERE report_id = ?", (report_id,))
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def migrate_json_to_sqlite(data_dir, db_name: str = "expenses.db") -> dict:
+    """Copy expenses.json and reports.json into a SQLite database.
+
+    Records already in the database are replaced by their JSON versions.
+    Returns the number of expenses and reports copied.
+    """
+    backend = SqliteBackend(data_dir, db_name, migrate=False)
+    try:
+        return backend.import_json(backend.data_dir / "expenses.json", backend.reports_file)
+    finally:
+        backend.close()
@@ -0,0 +1,228 @@
+"""
+Columnar, compressed export and import of the expense ledger.
+
+Parquet is written through pyarrow when it is installed. Without it the
+ledger is written in a self-describing native format: a JSON header
+followed by one zlib-compressed block per column, where numbers and
+timestamps are packed ``array`` buffers, category and payment method are
+dictionary-encoded, and text is stored as lengths plus one UTF-8 blob.
+``import_columnar`` reads either format back into a ``DatabaseManager``.
+"""
+
+import json
+import struct
+import sys
+import zlib
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+from .database import DatabaseManager
+from .indexes import date_key, from_date_key
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+NATIVE_MAGIC = b'SAKICF01'
+PARQUET_MAGIC = b'PAR1'
+
+_NULL_TIME = -(1 << 63)
+
+# Column name and storage kind, in record field order
+SCHEMA = (
+    ('id', 'text'),
+    ('description', 'text'),
+    ('amount', 'float'),
+    ('category', 'code'),
+    ('payment_method', 'code'),
+    ('date', 'time'),
+    ('notes', 'text'),
+    ('receipt_path', 'text'),
+    ('is_reimbursable', 'flag'),
+    ('created_at', 'time'),
+    ('updated_at', 'time'),
+)
+
+
+def _collect(records: Iterable[dict]) -> Dict[str, list]:
+    """Split records into per-column arrays in a single pass."""
+    columns = {}
+    for name, kind in SCHEMA:
+        if kind == 'float':
+            columns[name] = array('d')
+        elif kind == 'time':
+            columns[name] = array('q')
+        elif kind == 'flag':
+            columns[name] = array('B')
+        else:
+            columns[name] = []
+    for record in records:
+        for name, kind in SCHEMA:
+            value = record.get(name)
+            if kind == 'time':
+                value = date_key(value) if value else _NULL_TIME
+            elif kind == 'flag':
+                value = 1 if value else 0
+            columns[name].append(value)
+    return columns
+
+
+def _encode_text(values: List[Optional[str]]) -> bytes:
+    """Pack strings as int32 lengths (-1 for null) followed by UTF-8 data."""
+    encoded = [v.encode('utf-8') if v is not None else None for v in values]
+    lengths = array('i', (len(v) if v is not None else -1 for v in encoded))
+    return lengths.tobytes() + b''.join(v for v in encoded if v is not None)
+
+
+def _decode_text(data: bytes, rows: int, swap: bool = False) -> List[Optional[str]]:
+    """Unpack strings written by ``_encode_text``."""
+    lengths = array('i')
+    lengths.frombytes(data[:rows * lengths.itemsize])
+    if swap:
+        lengths.byteswap()
+    pos = rows * lengths.itemsize
+    values = []
+    for length in lengths:
+        if length < 0:
+            values.append(None)
+        else:
+            values.append(data[pos:pos + length].decode('utf-8'))
+            pos += length
+    return values
+
+
+def _write_native(path: Path, columns: Dict[str, list], level: int) -> None:
+    """Write columns in the native compressed format."""
+    rows = len(columns['amount'])
+    blocks = []
+    layout = []
+    for name, kind in SCHEMA:
+        values = columns[name]
+        entry = {'name': name, 'kind': kind}
+        if kind == 'text':
+            raw = _encode_text(values)
+        elif kind == 'code':
+            labels: Dict[str, int] = {}
+            codes = array('H', (labels.setdefault(v, len(labels)) for v in values))
+            entry['labels'] = list(labels)
+            raw = codes.tobytes()
+        else:
+            entry['typecode'] = values.typecode
+            raw = values.tobytes()
+        block = zlib.compress(raw, level)
+        entry['length'] = len(block)
+        layout.append(entry)
+        blocks.append(block)
+
+    header = json.dumps({'rows': rows, 'byteorder': sys.byteorder, 'columns': layout}).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(NATIVE_MAGIC + struct.pack('<I', len(header)) + header)
+        for block in blocks:
+            f.write(block)
+
+
+def _read_native(path: Path) -> Iterator[dict]:
+    """Yield records from a native columnar file."""
+    with open(path, 'rb') as f:
+        if f.read(8) != NATIVE_MAGIC:
+            raise ValueError(f"Not a columnar export: {path}")
+        header_len, = struct.unpack('<I', f.read(4))
+        header = json.loads(f.read(header_len))
+        rows = header['rows']
+        swap = header['byteorder'] != sys.byteorder
+        columns = {}
+        for entry in header['columns']:
+            raw = zlib.decompress(f.read(entry['length']))
+            if entry['kind'] == 'text':
+                columns[entry['name']] = _decode_text(raw, rows, swap)
+            elif entry['kind'] == 'code':
+                codes = array('H')
+                codes.frombytes(raw)
+                if swap:
+                    codes.byteswap()
+                labels = entry['labels']
+                columns[entry['name']] = [labels[c] for c in codes]
+            else:
+                values = array(entry['typecode'])
+                values.frombytes(raw)
+                if swap:
+                    values.byteswap()
+                columns[entry['name']] = values
+
+    for i in range(rows):
+        record = {}
+        for name, kind in SCHEMA:
+            value = columns[name][i]
+            if kind == 'time':
+                value = from_date_key(value).isoformat() if value != _NULL_TIME else None
+            elif kind == 'flag':
+                value = bool(value)
+            record[name] = value
+        yield record
+
+
+def _write_parquet(path: Path, columns: Dict[str, list]) -> None:
+    """Write columns to a Parquet file with pyarrow."""
+    arrays = {}
+    for name, kind in SCHEMA:
+        values = columns[name]
+        if kind == 'time':
+            arrays[name] = pa.array(
+                [from_date_key(v) if v != _NULL_TIME else None for v in values], pa.timestamp('us'))
+        elif kind == 'float':
+            arrays[name] = pa.array(values.tolist(), pa.float64())
+        elif kind == 'flag':
+            arrays[name] = pa.array([bool(v) for v in values], pa.bool_())
+        elif kind == 'code':
+            arrays[name] = pa.array(values, pa.string()).dictionary_encode()
+        else:
+            arrays[name] = pa.array(values, pa.string())
+    pq.write_table(pa.table(arrays), str(path), compression='zstd')
+
+
+def _read_parquet(path: Path) -> Iterator[dict]:
+    """Yield records from a Parquet file with pyarrow."""
+    table = pq.read_table(str(path))
+    for batch in table.to_batches():
+        for row in batch.to_pylist():
+            for name, kind in SCHEMA:
+                if kind == 'time' and row.get(name) is not None:
+                    row[name] = row[name].isoformat()
+            yield row
+
+
+def export_columnar(db: DatabaseManager, filepath: str, engine: Optional[str] = None, level: int = 6) -> int:
+    """Export the ledger to a columnar file and return the row count.
+
+    ``engine`` is ``'parquet'`` or ``'native'``; by default Parquet is used
+    when pyarrow is installed.
+    """
+    engine = engine or ('parquet' if pa is not None else 'native')
+    if engine == 'parquet' and pa is None:
+        raise ImportError("pyarrow is required for Parquet export")
+    columns = _collect(db.iter_expenses())
+    if engine == 'parquet':
+        _write_parquet(Path(filepath), columns)
+    else:
+        _write_native(Path(filepath), columns, level)
+    return len(columns['amount'])
+
+
+def read_columnar(filepath: str) -> Iterator[dict]:
+    """Yield expense records from a Parquet or native columnar file."""
+    path = Path(filepath)
+    with open(path, 'rb') as f:
+        magic = f.read(8)
+    if magic.startswith(PARQUET_MAGIC):
+        if pa is None:
+            raise ImportError("pyarrow is required to read Parquet files")
+        return _read_parquet(path)
+    return _read_native(path)
+
+
+def import_columnar(db: DatabaseManager, filepath: str) -> dict:
+    """Load a columnar export into the ledger with one bulk write."""
+    return db.save_expenses(read_columnar(filepath))
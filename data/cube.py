@@ -0,0 +1,189 @@
+"""
+Materialized aggregates of the expense ledger.
+
+The cube keeps the count, sum, minimum and maximum amount for every
+(category, payment method, month) cell. ``DatabaseManager`` applies the
+old and new version of each record it writes, so the cube stays current
+in constant time per change and distribution or trend queries never need
+to read individual expenses.
+
+Removing a record that held a cell's minimum or maximum cannot be undone
+from the aggregates alone, so that cell's extremes are marked stale and
+recomputed from the month's records the next time the cube is read.
+
+Alongside the cells the cube keeps a ``QuantileSketch`` of every amount
+and the total of reimbursable expenses, so quantiles, histograms and
+that total are maintained by the same updates.
+"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from .backends.base import load_json, save_json
+from .sketch import QuantileSketch
+
+CUBE_FIELDS = ('category', 'payment_method', 'month')
+
+
+def month_bounds(month: str) -> Tuple[datetime, datetime]:
+    """Get the first and last instant of a ``YYYY-MM`` month."""
+    year, mon = int(month[:4]), int(month[5:7])
+    start = datetime(year, mon, 1)
+    following = datetime(year + 1, 1, 1) if mon == 12 else datetime(year, mon + 1, 1)
+    return start, following - timedelta(microseconds=1)
+
+
+def shift_month(month: str, months: int) -> str:
+    """Move a ``YYYY-MM`` month forwards or backwards."""
+    index = int(month[:4]) * 12 + int(month[5:7]) - 1 + months
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+class AggregateCube:
+    """Count, sum, min and max of amounts in cents per cube cell."""
+
+    def __init__(self):
+        """Initialize an empty cube."""
+        # cell -> [count, sum, min, max]; min and max are None when stale
+        self.cells: Dict[Tuple[str, str, str], List[Optional[int]]] = {}
+        self.signature: Optional[str] = None
+        self.sketch = QuantileSketch()
+        self.reimbursable_cents = 0
+        self._stale: Set[str] = set()
+
+    @staticmethod
+    def cell_of(record: dict) -> Tuple[str, str, str]:
+        """Get the cell a record belongs to."""
+        return (record['category'], record['payment_method'], record['date'][:7])
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict]) -> "AggregateCube":
+        """Build a cube from expense records in a single pass."""
+        cube = cls()
+        for record in records:
+            cube.add(record)
+        return cube
+
+    def add(self, record: dict) -> None:
+        """Add one record to its cell and the amount sketch."""
+        cents = round(record['amount'] * 100)
+        self.sketch.add(cents)
+        if record.get('is_reimbursable'):
+            self.reimbursable_cents += cents
+        self._add_to_cell(record, cents)
+
+    def _add_to_cell(self, record: dict, cents: int) -> None:
+        """Add one record's amount to its cell only."""
+        cell = self.cells.get(self.cell_of(record))
+        if cell is None:
+            self.cells[self.cell_of(record)] = [1, cents, cents, cents]
+            return
+        cell[0] += 1
+        cell[1] += cents
+        if cell[2] is not None:
+            cell[2] = min(cell[2], cents)
+            cell[3] = max(cell[3], cents)
+
+    def remove(self, record: dict) -> None:
+        """Remove one record from its cell and the amount sketch."""
+        key = self.cell_of(record)
+        cell = self.cells.get(key)
+        if cell is None:
+            return
+        cents = round(record['amount'] * 100)
+        self.sketch.remove(cents)
+        if record.get('is_reimbursable'):
+            self.reimbursable_cents -= cents
+        cell[0] -= 1
+        cell[1] -= cents
+        if cell[0] <= 0:
+            del self.cells[key]
+        elif cents == cell[2] or cents == cell[3]:
+            cell[2] = cell[3] = None
+            self._stale.add(key[2])
+
+    def apply(self, old: Optional[dict], new: Optional[dict]) -> None:
+        """Replace a record's old version with its new one; either may be None."""
+        if old is not None:
+            self.remove(old)
+        if new is not None:
+            self.add(new)
+
+    def stale_months(self) -> Set[str]:
+        """Get months holding cells whose min and max must be recomputed."""
+        return set(self._stale)
+
+    def rebuild_month(self, month: str, records: Iterable[dict]) -> None:
+        """Recompute every cell of a month from that month's records."""
+        for key in [k for k in self.cells if k[2] == month]:
+            del self.cells[key]
+        for record in records:
+            if record['date'][:7] == month:
+                self._add_to_cell(record, round(record['amount'] * 100))
+        self._stale.discard(month)
+
+    def totals(
+        self,
+        group_by: Sequence[str] = ('category',),
+        start_month: Optional[str] = None,
+        end_month: Optional[str] = None
+    ) -> dict:
+        """Roll cells up to the given fields, optionally within a month range.
+
+        Keys are the field value for a single field and tuples otherwise.
+        Each entry holds ``count`` and ``total``, ``min`` and ``max`` in
+        currency units.
+        """
+        positions = [CUBE_FIELDS.index(f) for f in group_by]
+        rolled: Dict[object, List[Optional[int]]] = {}
+        for key, (count, cents, low, high) in self.cells.items():
+            month = key[2]
+            if (start_month and month < start_month) or (end_month and month > end_month):
+                continue
+            group = key[positions[0]] if len(positions) == 1 else tuple(key[p] for p in positions)
+            entry = rolled.get(group)
+            if entry is None:
+                rolled[group] = [count, cents, low, high]
+                continue
+            entry[0] += count
+            entry[1] += cents
+            entry[2] = None if entry[2] is None or low is None else min(entry[2], low)
+            entry[3] = None if entry[3] is None or high is None else max(entry[3], high)
+        return {
+            group: {
+                'count': count,
+                'total': cents / 100,
+                'min': low / 100 if low is not None else None,
+                'max': high / 100 if high is not None else None,
+            }
+            for group, (count, cents, low, high) in rolled.items()
+        }
+
+    def save(self, path: Path) -> None:
+        """Persist the cube and the ledger signature it matches."""
+        save_json(path, {
+            'version': 3,
+            'signature': self.signature,
+            'reimbursable_cents': self.reimbursable_cents,
+            'cells': [list(key) + cell for key, cell in self.cells.items()],
+            'sketch': self.sketch.to_dict(),
+        })
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["AggregateCube"]:
+        """Load a persisted cube, or None if there is no usable file."""
+        try:
+            data = load_json(path)
+        except (OSError, ValueError):
+            return None
+        if not data or data.get('version') != 3:
+            return None
+        cube = cls()
+        cube.signature = data.get('signature')
+        cube.reimbursable_cents = data['reimbursable_cents']
+        cube.sketch = QuantileSketch.from_dict(data['sketch'])
+        for row in data['cells']:
+            cube.cells[tuple(row[:3])] = row[3:]
+            if row[5] is None:
+                cube._stale.add(row[2])
+        return cube
@@ -2,81 +2,598 @@
 Database management for expense data persistence.
 """
 
+import csv
+import gc
 import json
 import os
-from datetime import datetime
-from typing import List, Optional
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import date, datetime, time as dt_time, timedelta
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
 from pathlib import Path
-from .models import Expense, ExpenseReport, ExpenseCategory, PaymentMethod
+from .models import Expense, ExpenseReport, ExpenseCategory
+from .backends import create_backend
+from .backends.base import GroupCommitter, load_json, save_json
+from .cube import AggregateCube, month_bounds
+from .frame import ExpenseFrame
+from .indexes import AmountIndex, DayTotals, LedgerOrder, TextIndex, TrigramIndex
+from .query import ExpenseQuery
+from .snapshot import ColumnarSnapshot, write_snapshot
+
+
+EXPORT_COLUMNS = (
+    'id', 'description', 'amount', 'category', 'payment_method', 'date',
+    'notes', 'receipt_path', 'is_reimbursable', 'created_at', 'updated_at',
+)
+
+# Memory budget for one Expense object, measured with ``measure_memory_per_row``
+# at about 390 bytes for typical records against about 980 for the dict form
+EXPENSE_ROW_BYTES_TARGET = 450
+
+# Planner cost of reading one candidate through an index, which is a
+# ``find_expense`` call (lock, stat, dict copy), in units of one scanned
+# row; measured at about 12x on a 100k-row JSON ledger
+INDEX_FETCH_COST = 12
+# Extra planner cost per scanned row of matching full-text terms, which
+# tokenizes every description and note
+TERMS_SCAN_COST = 10
+
+# JSON commit window for the manager the UI shares, so a burst of edits or
+# an import rewrites the file once instead of once per change
+UI_COMMIT_DELAY = 0.25
 
 
 class DatabaseManager:
-    """Manages persistence of expense data to JSON files."""
+    """Manages persistence of expense data through a storage backend."""
+
+    _shared: Dict[tuple, "DatabaseManager"] = {}
+    _shared_lock = threading.Lock()
 
-    def __init__(self, data_dir: str = "data/storage"):
-        """Initialize database manager."""
+    def __init__(
+        self,
+        data_dir: str = "data/storage",
+        backend: str = "json",
+        cube_save_delay: float = 1.0,
+        **options
+    ):
+        """Initialize database manager.
+
+        Extra keyword options are passed to the storage backend, e.g.
+        ``commit_delay`` to group JSON writes or ``fsync`` for the journal.
+        Aggregate cube updates are persisted at most once per
+        ``cube_save_delay`` seconds.
+        """
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.expenses_file = self.data_dir / "expenses.json"
         self.reports_file = self.data_dir / "reports.json"
+        self.snapshot_file = self.data_dir / "expenses.columns"
+        self.cube_file = self.data_dir / "expenses.cube.json"
+        self._snapshot: Optional[ColumnarSnapshot] = None
+        self._snapshot_lock = threading.Lock()
+        self._frame: Optional[ExpenseFrame] = None
+        self._frame_source: Optional[ColumnarSnapshot] = None
+        self._cube: Optional[AggregateCube] = None
+        # Index class -> instance, kept current by ``_tracked_write``
+        self._indexes: Dict[type, object] = {}
+        self._cube_lock = threading.RLock()
+        self._version = 0
+        self._version_signature: Optional[str] = None
+        self._cube_saver = GroupCommitter(self._save_cube, cube_save_delay)
+        self._snapshot_version: Optional[int] = None
+        self.backend = create_backend(backend, self.data_dir, **options)
+        self.backend.on_flush = self._on_backend_flush
         self._initialize_files()
 
+    @classmethod
+    def shared(cls, data_dir: str = "data/storage", backend: str = "json", **options) -> "DatabaseManager":
+        """Get the process-wide manager for a data directory.
+
+        Sharing one instance lets every caller reuse the same in-memory
+        ledger instead of each parsing the storage files on its own. Backend
+        options only apply when the shared instance is first created.
+        """
+        key = (str(Path(data_dir).resolve()), backend)
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(data_dir, backend, **options)
+            return cls._shared[key]
+
     def _initialize_files(self) -> None:
         """Create JSON files if they don't exist."""
-        if not self.expenses_file.exists():
-            self._save_json(self.expenses_file, [])
         if not self.reports_file.exists():
             self._save_json(self.reports_file, [])
 
     def _save_json(self, filepath: Path, data: any) -> None:
         """Save data to JSON file."""
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2, default=str)
+        save_json(filepath, data)
 
     def _load_json(self, filepath: Path) -> any:
         """Load data from JSON file."""
-        if not filepath.exists():
-            return None
-        with open(filepath, 'r') as f:
-            return json.load(f)
+        return load_json(filepath)
+
+    def flush(self) -> None:
+        """Write out any changes the backend is still holding in memory."""
+        self.backend.flush()
+        self._on_backend_flush()
+        self._cube_saver.flush_now()
+
+    def _on_backend_flush(self) -> None:
+        """Match the cube and ledger version to the file after held-back writes land."""
+        with self._cube_lock:
+            self._adopt_flushed(self._signature_key())
+
+    def _adopt_flushed(self, key: Optional[str]) -> None:
+        """Mark the cube and version current if ``key`` is what the backend's own flush wrote.
+
+        Must be called with ``_cube_lock`` held.
+        """
+        flushed = self.backend.flushed_signature
+        if key is None or flushed is None or json.dumps(flushed) != key:
+            return
+        if self._cube is not None and self._cube.signature is None:
+            self._cube.signature = key
+            self._cube_saver.request()
+        if self._version_signature is None:
+            self._version_signature = key
+
+    def close(self) -> None:
+        """Flush pending changes and release the backend."""
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+        self._frame = None
+        self._frame_source = None
+        self.backend.close()
+        self._on_backend_flush()
+        self._cube_saver.flush_now()
+
+    def get_columnar_snapshot(self) -> ColumnarSnapshot:
+        """Get a memory-mapped columnar snapshot, rewritten only when the ledger version changes."""
+        version = self.ledger_version()
+        key = self._signature_key()
+        with self._snapshot_lock:
+            if self._snapshot is not None and self._snapshot_version == version:
+                return self._snapshot
+            if self._snapshot is None and key is not None and self.snapshot_file.exists():
+                try:
+                    self._snapshot = ColumnarSnapshot(self.snapshot_file)
+                except (OSError, ValueError):
+                    self._snapshot = None
+            if self._snapshot is None or key is None or self._snapshot.signature != key:
+                if self._snapshot is not None:
+                    self._snapshot.close()
+                    self._snapshot = None
+                write_snapshot(self.snapshot_file, self.backend.load_expenses(), key)
+                self._snapshot = ColumnarSnapshot(self.snapshot_file)
+            self._snapshot_version = version
+            return self._snapshot
+
+    def get_expense_frame(self) -> ExpenseFrame:
+        """Get the ledger as an ``ExpenseFrame``, rebuilt when the snapshot changes."""
+        snapshot = self.get_columnar_snapshot()
+        with self._snapshot_lock:
+            if self._frame is None or self._frame_source is not snapshot:
+                self._frame = ExpenseFrame.from_snapshot(snapshot)
+                self._frame_source = snapshot
+            return self._frame
+
+    def _signature_key(self) -> Optional[str]:
+        """Get the backend signature as a comparable string."""
+        signature = self.backend.signature()
+        return json.dumps(signature) if signature is not None else None
+
+    def _save_cube(self) -> None:
+        """Persist the aggregate cube if it matches the stored ledger."""
+        with self._cube_lock:
+            if self._cube is not None and self._cube.signature is not None:
+                self._cube.save(self.cube_file)
+
+    def _tracked_write(self, changes: Dict[str, Optional[dict]], write: Callable):
+        """Run a backend write and apply its changes to the aggregate cube.
+
+        ``changes`` maps each written ID to its new record, or None for a
+        delete. The old versions are read first so the cube can subtract
+        them; if the write fails the cube and indexes are dropped and
+        rebuilt later.
+        """
+        with self._cube_lock:
+            cube = self._current_cube()
+            before = {i: self.backend.find_expense(i) for i in changes}
+            try:
+                result = write()
+            except Exception:
+                self._drop_derived()
+                self._bump_version()
+                raise
+            for expense_id, record in changes.items():
+                cube.apply(before[expense_id], record)
+                for index in self._indexes.values():
+                    if record is not None:
+                        index.add(record)
+                    else:
+                        index.remove(expense_id)
+            cube.signature = self._signature_key()
+            self._bump_version(cube.signature)
+            if cube.signature is not None:
+                self._cube_saver.request()
+            return result
+
+    def _bump_version(self, signature: Optional[str] = None) -> None:
+        """Advance the ledger version after a mutation."""
+        with self._cube_lock:
+            self._version += 1
+            self._version_signature = signature
+
+    def ledger_version(self) -> int:
+        """Get a counter that increases whenever the stored data may have changed."""
+        key = self._signature_key()
+        with self._cube_lock:
+            self._adopt_flushed(key)
+            if key is not None and key != self._version_signature:
+                self._bump_version(key)
+            return self._version
+
+    def _current_cube(self) -> AggregateCube:
+        """Get the cube matching the ledger, loading or rebuilding it as needed."""
+        key = self._signature_key()
+        self._adopt_flushed(key)
+        if self._cube is None:
+            self._cube = AggregateCube.load(self.cube_file)
+        if self._cube is None or self._cube.signature != key:
+            self._cube = AggregateCube.from_records(self.backend.iter_expenses())
+            self._cube.signature = key
+            self._indexes.clear()
+            self._cube_saver.request()
+        return self._cube
+
+    def _drop_derived(self) -> None:
+        """Forget the cube and indexes so they are rebuilt on next use."""
+        self._cube = None
+        self._indexes.clear()
+
+    def _current_index(self, kind: type):
+        """Get an in-memory index, building it if the ledger changed elsewhere."""
+        self._current_cube()
+        index = self._indexes.get(kind)
+        if index is None:
+            index = self._indexes[kind] = kind(self.backend.iter_expenses())
+        return index
+
+    def _current_amount_index(self) -> AmountIndex:
+        """Get the amount index."""
+        return self._current_index(AmountIndex)
+
+    def _current_day_totals(self) -> DayTotals:
+        """Get the per-day totals."""
+        return self._current_index(DayTotals)
+
+    def _current_text_index(self) -> TextIndex:
+        """Get the full-text index of descriptions and notes."""
+        return self._current_index(TextIndex)
+
+    def search_text(self, text: str, limit: Optional[int] = None) -> List[dict]:
+        """Get expenses whose description or notes contain every word of ``text``.
+
+        Each word also matches longer words it begins, so partial input
+        finds results as it is typed. Results are ranked by relevance.
+        """
+        with self._cube_lock:
+            ids = self._current_text_index().search(text, limit)
+        records = (self.backend.find_expense(i) for i in ids)
+        return [r for r in records if r is not None]
+
+    def get_range_total(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        category: Optional[ExpenseCategory] = None
+    ) -> float:
+        """Get the total of expenses within an inclusive date range.
+
+        Whole days come from per-day prefix sums kept up to date on every
+        write, in O(log n); only a partial first or last day is read
+        expense by expense.
+        """
+        if end_date < start_date:
+            return 0
+        first_day = start_date.toordinal() + (start_date.time() != dt_time.min)
+        last_day = end_date.toordinal() - (end_date.time() != dt_time.max)
+        with self._cube_lock:
+            cents = self._current_day_totals().total_cents(
+                first_day, last_day, category.value if category else None
+            )
+        if first_day > last_day:
+            edges = [(start_date, end_date)]
+        else:
+            edges = [
+                (start_date, datetime.combine(date.fromordinal(first_day), dt_time.min) - timedelta(microseconds=1)),
+                (datetime.combine(date.fromordinal(last_day), dt_time.max) + timedelta(microseconds=1), end_date),
+            ]
+        for lo, hi in edges:
+            if lo <= hi:
+                for expense in self.backend.iter_by_date_range(lo, hi):
+                    if category is None or expense['category'] == category.value:
+                        cents += round(expense['amount'] * 100)
+        return cents / 100
+
+    def get_date_span(self) -> Optional[tuple]:
+        """Get the dates of the earliest and latest expenses, or None if there are none."""
+        with self._cube_lock:
+            span = self._current_day_totals().span()
+        return (date.fromordinal(span[0]), date.fromordinal(span[1])) if span else None
+
+    def get_top_expenses(
+        self,
+        limit: int = 10,
+        category: Optional[ExpenseCategory] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        largest: bool = True
+    ) -> List[dict]:
+        """Get the largest (or smallest) expenses, optionally by category or date range.
+
+        Answered from an amount-ordered index kept up to date on every
+        write, so only the returned expenses are read.
+        """
+        with self._cube_lock:
+            ids = self._current_amount_index().top(
+                limit, largest, category.value if category else None, start_date, end_date
+            )
+        records = (self.backend.find_expense(i) for i in ids)
+        return [r for r in records if r is not None]
+
+    def iter_expenses_by_amount(
+        self,
+        descending: bool = True,
+        category: Optional[ExpenseCategory] = None
+    ) -> Iterator[dict]:
+        """Yield expenses in amount order without sorting the ledger."""
+        with self._cube_lock:
+            ids = self._current_amount_index().ids_by_amount(descending, category.value if category else None)
+        for expense_id in ids:
+            record = self.backend.find_expense(expense_id)
+            if record is not None:
+                yield record
+
+    def _plan_query(self, query: ExpenseQuery) -> tuple:
+        """Choose how to read a query's candidates.
+
+        Returns the plan name, estimated rows read, whether rows come in sort order, and the candidates.
+        """
+        amounts = self._current_amount_index()
+        days = self._current_day_totals()
+        total = len(amounts)
+        category = query.category.value if query.category else None
+        low, high = query.amount_bounds()
+
+        # (name, estimated rows, presorted, cost per row)
+        scan_cost = 1 + TERMS_SCAN_COST if query.words() else 1
+        candidates = [('scan', total, False, scan_cost)]
+        if category is not None or low is not None or high is not None or query.sort_by == 'amount':
+            candidates.append((
+                'amount', amounts.count_in_range(low, high, category), query.sort_by == 'amount', INDEX_FETCH_COST
+            ))
+        span = days.span()
+        if span and (query.start_date is not None or query.end_date is not None):
+            first = query.start_date.toordinal() if query.start_date is not None else span[0]
+            last = query.end_date.toordinal() if query.end_date is not None else span[1]
+            candidates.append(('date', days.count(first, last), False, scan_cost))
+        if query.text:
+            trigrams = self._current_index(TrigramIndex)
+            candidates.append(('substring', trigrams.estimate(query.text), False, INDEX_FETCH_COST))
+        if query.words():
+            text = self._current_text_index()
+            candidates.append(('text', text.estimate(query.terms), query.sort_by == 'relevance', INDEX_FETCH_COST))
+        if query.sort_by == 'relevance':
+            candidates = candidates[-1:]
+
+        matched = min(estimate for _, estimate, _, _ in candidates)
+        wanted = query.offset + query.limit if query.limit is not None else None
+
+        def cost(candidate: tuple) -> tuple:
+            _, estimate, ordered, per_row = candidate
+            if ordered and wanted is not None and matched:
+                estimate = min(estimate, wanted * estimate / matched)
+            return estimate * per_row, not ordered
+
+        name, estimate, ordered, _ = min(candidates, key=cost)
+        ids = None
+        if name == 'amount':
+            descending = query.descending if query.sort_by == 'amount' else True
+            ids = amounts.ids_in_range(low, high, category, descending)
+        elif name == 'substring':
+            ids = trigrams.candidates(query.text)
+        elif name == 'text':
+            # The text index only knows the terms, so it can stop at the page
+            # only when no other predicate may drop rows from it
+            only_terms = query.where(terms=None, sort_by=None, descending=False, limit=None, offset=0) == ExpenseQuery()
+            ids = text.search(query.terms, wanted if ordered and only_terms else None)
+        elif name == 'date':
+            records = self.backend.iter_by_date_range(
+                query.start_date or datetime.min, query.end_date or datetime.max
+            )
+            if query.sort_by is None:
+                ledger = self._current_index(LedgerOrder)
+                by_id = {r['id']: r for r in records}
+                records = (by_id[i] for i in ledger.sort(by_id))
+        else:
+            records = self.backend.iter_expenses()
+        if ids is not None:
+            if query.sort_by is None:
+                ids = self._current_index(LedgerOrder).sort(ids)
+            records = (r for r in map(self.backend.find_expense, ids) if r is not None)
+        return name, estimate, ordered, records
+
+    def explain_query(self, query: ExpenseQuery) -> dict:
+        """Describe the plan ``query_expenses`` would use for a query."""
+        with self._cube_lock:
+            name, estimate, ordered, _ = self._plan_query(query)
+            total = len(self._current_amount_index())
+        return {
+            'index': name,
+            'estimated_rows': round(estimate),
+            'total_rows': total,
+            'presorted': ordered or query.sort_by is None,
+        }
+
+    def query_expenses(self, query: ExpenseQuery) -> Iterator[dict]:
+        """Yield the expenses matching a query, sorted and paged.
+
+        Candidates are read through the cheapest plan, then every
+        predicate is checked. Results stream when the plan already yields
+        the requested order; otherwise matches are sorted first. Without
+        ``sort_by`` they come in ledger order, as a full scan returns them.
+        """
+        with self._cube_lock:
+            _, _, ordered, records = self._plan_query(query)
+        matches = (r for r in records if query.matches(r))
+        if query.sort_by is not None and not ordered:
+            matches = iter(sorted(matches, key=query.sort_key, reverse=query.descending))
+        stop = query.offset + query.limit if query.limit is not None else None
+        return islice(matches, query.offset, stop)
+
+    def get_aggregate_cube(self) -> AggregateCube:
+        """Get the aggregate cube, rebuilding it if the ledger changed elsewhere."""
+        with self._cube_lock:
+            self._current_cube()
+            stale = self._cube.stale_months()
+            for month in sorted(stale):
+                self._cube.rebuild_month(month, self.backend.iter_by_date_range(*month_bounds(month)))
+            if stale:
+                self._cube_saver.request()
+            return self._cube
 
     def save_expense(self, expense: Expense) -> bool:
         """Save or update an expense."""
         try:
-            expenses = self._load_json(self.expenses_file) or []
-            expense_dict = expense.to_dict()
-
-            # Check if expense exists and update
-            existing_idx = next((i for i, e in enumerate(expenses) if e['id'] == expense.id), None)
-            if existing_idx is not None:
-                expenses[existing_idx] = expense_dict
-            else:
-                expenses.append(expense_dict)
-
-            self._save_json(self.expenses_file, expenses)
+            record = expense.to_dict()
+            self._tracked_write({record['id']: record}, lambda: self.backend.put_expense(record))
             return True
         except Exception as e:
             print(f"Error saving expense: {e}")
             return False
 
+    def save_expenses(self, expenses: Iterable) -> dict:
+        """Save or update many expenses with a single write.
+
+        Accepts ``Expense`` objects or records already in ``to_dict`` form.
+        When the batch repeats an ID the last expense wins. Returns per-row
+        results along with counts and throughput for the batch.
+        """
+        started = time.perf_counter()
+        results = []
+        records = {}
+        for expense in expenses:
+            try:
+                record = dict(expense) if isinstance(expense, dict) else expense.to_dict()
+            except Exception as e:
+                results.append({'id': getattr(expense, 'id', None), 'status': 'failed', 'error': str(e)})
+                continue
+            records[record['id']] = record
+            results.append({'id': record['id'], 'status': 'saved'})
+
+        try:
+            self._tracked_write(records, lambda: self.backend.put_expenses(list(records.values())))
+        except Exception as e:
+            print(f"Error saving expenses: {e}")
+            for result in results:
+                if result['status'] == 'saved':
+                    result.update(status='failed', error=str(e))
+        return self._bulk_summary(results, started)
+
+    def delete_expenses(self, expense_ids: Iterable[str]) -> dict:
+        """Delete many expenses with a single write.
+
+        Returns per-row results along with counts and throughput for the batch.
+        """
+        started = time.perf_counter()
+        expense_ids = list(expense_ids)
+        try:
+            deleted = set(self._tracked_write(
+                dict.fromkeys(expense_ids), lambda: self.backend.delete_expenses(expense_ids)
+            ))
+            results = [{'id': i, 'status': 'deleted' if i in deleted else 'missing'} for i in expense_ids]
+        except Exception as e:
+            print(f"Error deleting expenses: {e}")
+            results = [{'id': i, 'status': 'failed', 'error': str(e)} for i in expense_ids]
+        return self._bulk_summary(results, started)
+
+    def _bulk_summary(self, results: List[dict], started: float) -> dict:
+        """Summarize per-row results of a bulk operation."""
+        elapsed = time.perf_counter() - started
+        summary = {'results': results, 'elapsed': round(elapsed, 6)}
+        for result in results:
+            summary[result['status']] = summary.get(result['status'], 0) + 1
+        summary['rows_per_second'] = round(len(results) / elapsed, 1) if elapsed > 0 else 0
+        return summary
+
     def get_expenses(self, category: Optional[ExpenseCategory] = None) -> List[dict]:
         """Get all expenses or filter by category."""
-        expenses = self._load_json(self.expenses_file) or []
         if category:
-            expenses = [e for e in expenses if e['category'] == category.value]
-        return expenses
+            return self.backend.find_by_category(category.value)
+        return self.backend.load_expenses()
+
+    def iter_expenses(self) -> Iterator[dict]:
+        """Yield all expenses one at a time without loading the whole ledger."""
+        return self.backend.iter_expenses()
+
+    def load_expense_objects(self, category: Optional[ExpenseCategory] = None) -> List[Expense]:
+        """Load expenses as compact ``Expense`` objects, streaming past the dict form."""
+        records = self.backend.iter_expenses()
+        if category:
+            records = (r for r in records if r['category'] == category.value)
+        return [Expense.from_dict(r) for r in records]
+
+    def measure_memory_per_row(self, sample_size: int = 10000) -> dict:
+        """Measure the average bytes held per expense as a dict and as an Expense.
+
+        Each form is built from a private copy of up to ``sample_size``
+        records while tracemalloc is running.
+        """
+        sample = list(islice(self.backend.iter_expenses(), sample_size))
+        rows = len(sample)
+        blob = json.dumps(sample)
+        del sample
+        if not rows:
+            return {'rows': 0}
+
+        def traced(build) -> float:
+            gc.collect()
+            tracemalloc.start()
+            try:
+                held = build()
+                size = tracemalloc.get_traced_memory()[0]
+            finally:
+                tracemalloc.stop()
+            del held
+            return size / rows
+
+        dict_bytes = traced(lambda: json.loads(blob))
+        expense_bytes = traced(lambda: [Expense.from_dict(r) for r in json.loads(blob)])
+        return {
+            'rows': rows,
+            'dict_bytes': round(dict_bytes, 1),
+            'expense_bytes': round(expense_bytes, 1),
+            'target_bytes': EXPENSE_ROW_BYTES_TARGET,
+            'within_target': expense_bytes <= EXPENSE_ROW_BYTES_TARGET,
+        }
+
+    def iter_expenses_by_date_range(self, start_date: datetime, end_date: datetime) -> Iterator[dict]:
+        """Yield expenses within date range one at a time."""
+        return self.backend.iter_by_date_range(start_date, end_date)
 
     def get_expense_by_id(self, expense_id: str) -> Optional[dict]:
         """Get expense by ID."""
-        expenses = self._load_json(self.expenses_file) or []
-        return next((e for e in expenses if e['id'] == expense_id), None)
+        return self.backend.find_expense(expense_id)
 
     def delete_expense(self, expense_id: str) -> bool:
         """Delete an expense."""
         try:
-            expenses = self._load_json(self.expenses_file) or []
-            expenses = [e for e in expenses if e['id'] != expense_id]
-            self._save_json(self.expenses_file, expenses)
+            self._tracked_write({expense_id: None}, lambda: self.backend.delete_expense(expense_id))
             return True
         except Exception as e:
             print(f"Error deleting expense: {e}")
@@ -84,35 +601,29 @@ class DatabaseManager:
 
     def get_expenses_by_date_range(self, start_date: datetime, end_date: datetime) -> List[dict]:
         """Get expenses within date range."""
-        expenses = self._load_json(self.expenses_file) or []
-        filtered = []
-        for expense in expenses:
-            exp_date = datetime.fromisoformat(expense['date'])
-            if start_date <= exp_date <= end_date:
-                filtered.append(expense)
-        return filtered
+        return self.backend.find_by_date_range(start_date, end_date)
 
     def save_report(self, report: ExpenseReport) -> bool:
-        """Save or update a report."""
+        """Save or update a report.
+
+        Expenses are stored by ID alongside cached totals, and are loaded
+        again only when the report is opened with ``get_report``.
+        """
         try:
-            reports = self._load_json(self.reports_file) or []
             report_dict = {
                 'report_id': report.report_id,
                 'title': report.title,
                 'start_date': report.start_date.isoformat(),
                 'end_date': report.end_date.isoformat(),
-                'expenses': [e.to_dict() for e in report.expenses],
+                'expense_ids': [e.id for e in report.expenses],
+                'total': report.get_total(),
+                'expense_count': len(report.expenses),
+                'category_totals': report.get_category_totals(),
                 'notes': report.notes,
                 'created_at': report.created_at.isoformat(),
             }
-
-            existing_idx = next((i for i, r in enumerate(reports) if r['report_id'] == report.report_id), None)
-            if existing_idx is not None:
-                reports[existing_idx] = report_dict
-            else:
-                reports.append(report_dict)
-
-            self._save_json(self.reports_file, reports)
+            self.backend.put_report(report_dict)
+            self._bump_version(self._signature_key())
             return True
         except Exception as e:
             print(f"Error saving report: {e}")
@@ -120,14 +631,39 @@ class DatabaseManager:
 
     def get_reports(self) -> List[dict]:
         """Get all reports."""
-        return self._load_json(self.reports_file) or []
+        return self.backend.load_reports()
+
+    def get_report(self, report_id: str) -> Optional[ExpenseReport]:
+        """Get a report with its expenses loaded.
+
+        Expenses deleted since the report was saved are left out. Reports
+        saved before expenses were stored by ID keep their embedded copies.
+        """
+        report_dict = next((r for r in self.backend.load_reports() if r['report_id'] == report_id), None)
+        if report_dict is None:
+            return None
+
+        if 'expense_ids' in report_dict:
+            records = (self.backend.find_expense(i) for i in report_dict['expense_ids'])
+            expenses = [Expense.from_dict(r) for r in records if r is not None]
+        else:
+            expenses = [Expense.from_dict(r) for r in report_dict.get('expenses', [])]
+
+        return ExpenseReport(
+            report_id=report_dict['report_id'],
+            title=report_dict['title'],
+            start_date=datetime.fromisoformat(report_dict['start_date']),
+            end_date=datetime.fromisoformat(report_dict['end_date']),
+            expenses=expenses,
+            notes=report_dict.get('notes'),
+            created_at=datetime.fromisoformat(report_dict['created_at'])
+        )
 
     def delete_report(self, report_id: str) -> bool:
         """Delete a report."""
         try:
-            reports = self._load_json(self.reports_file) or []
-            reports = [r for r in reports if r['report_id'] != report_id]
-            self._save_json(self.reports_file, reports)
+            self.backend.delete_report(report_id)
+            self._bump_version(self._signature_key())
             return True
         except Exception as e:
             print(f"Error deleting report: {e}")
@@ -136,8 +672,8 @@ class DatabaseManager:
     def export_expenses_csv(self, filepath: str, expenses: Optional[List[dict]] = None) -> bool:
         """Export expenses to CSV file."""
         try:
-            import csv
-            expenses = expenses or self.get_expenses()
+            if expenses is None:
+                return bool(self.stream_expenses_csv(filepath))
             if not expenses:
                 return False
 
@@ -149,3 +685,62 @@ class DatabaseManager:
         except Exception as e:
             print(f"Error exporting to CSV: {e}")
             return False
+
+    def stream_expenses_csv(
+        self,
+        filepath: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        category: Optional[ExpenseCategory] = None,
+        columns: Optional[Sequence[str]] = None,
+        chunk_size: int = 1000,
+        progress: Optional[Callable[[int], None]] = None,
+        should_cancel: Optional[Callable[[], bool]] = None
+    ) -> Optional[int]:
+        """Export expenses to CSV in chunks without loading the ledger.
+
+        Returns the number of rows written, or None if cancelled.
+        """
+        columns = list(columns or EXPORT_COLUMNS)
+        if start_date is not None or end_date is not None:
+            expenses = self.iter_expenses_by_date_range(start_date or datetime.min, end_date or datetime.max)
+        else:
+            expenses = self.iter_expenses()
+        if category:
+            expenses = (e for e in expenses if e['category'] == category.value)
+
+        target = Path(filepath)
+        fd, tmp_path = tempfile.mkstemp(dir=target.parent, prefix=target.name + '.', suffix='.tmp')
+        written = 0
+        cancelled = False
+        try:
+            with os.fdopen(fd, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=columns, extrasaction='ignore')
+                writer.writeheader()
+                chunk = []
+                for expense in expenses:
+                    chunk.append(expense)
+                    if len(chunk) < chunk_size:
+                        continue
+                    if should_cancel and should_cancel():
+                        cancelled = True
+                        break
+                    writer.writerows(chunk)
+                    written += len(chunk)
+                    chunk = []
+                    if progress:
+                        progress(written)
+                if not cancelled:
+                    writer.writerows(chunk)
+                    written += len(chunk)
+                    if progress:
+                        progress(written)
+            if cancelled:
+                os.unlink(tmp_path)
+                return None
+            os.replace(tmp_path, target)
+            return written
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
@@ -0,0 +1,656 @@
+"""
+In-memory indexes over expense records.
+"""
+
+import heapq
+import math
+import re
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
+
+_MICROS_PER_DAY = 86_400_000_000
+_TOKEN = re.compile(r"\w+")
+
+
+def date_key(value) -> int:
+    """Convert a datetime or ISO string into a sortable integer key.
+
+    The key counts microseconds from the proleptic Gregorian origin, so
+    comparing keys gives the same answer as comparing the datetimes.
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    seconds = value.hour * 3600 + value.minute * 60 + value.second
+    return value.toordinal() * _MICROS_PER_DAY + seconds * 1_000_000 + value.microsecond
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+def from_date_key(key: int) -> datetime:
+    """Convert a key produced by ``date_key`` back into a datetime."""
+    days, micros = divmod(key, _MICROS_PER_DAY)
+    return datetime.fromordinal(days) + timedelta(microseconds=micros)
+
+
+class DateIndex:
+    """Sorted date keys paired with the IDs of the records they belong to.
+
+    Range lookups are a bisect plus a slice. Records with equal dates stay
+    in the order they were added.
+    """
+
+    def __init__(self, records: Iterable[dict] = ()):
+        """Build the index from expense records."""
+        pairs = sorted(((date_key(r['date']), r['id']) for r in records), key=lambda p: p[0])
+        self._keys: List[int] = [key for key, _ in pairs]
+        self._ids: List[str] = [expense_id for _, expense_id in pairs]
+        self._key_by_id: Dict[str, int] = {expense_id: key for key, expense_id in pairs}
+
+    def __len__(self) -> int:
+        """Get the number of indexed records."""
+        return len(self._keys)
+
+    def add(self, record: dict) -> None:
+        """Index a record, replacing any previous entry with the same ID."""
+        self.remove(record['id'])
+        key = date_key(record['date'])
+        pos = bisect_right(self._keys, key)
+        self._keys.insert(pos, key)
+        self._ids.insert(pos, record['id'])
+        self._key_by_id[record['id']] = key
+
+    def remove(self, expense_id: str) -> None:
+        """Drop a record from the index if it is present."""
+        key = self._key_by_id.pop(expense_id, None)
+        if key is None:
+            return
+        pos = bisect_left(self._keys, key)
+        while self._ids[pos] != expense_id:
+            pos += 1
+        del self._keys[pos]
+        del self._ids[pos]
+
+    def ids_between(self, start_date: datetime, end_date: datetime) -> List[str]:
+        """Get IDs of records dated within an inclusive range, in date order."""
+        lo = bisect_left(self._keys, date_key(start_date))
+        hi = bisect_right(self._keys, date_key(end_date))
+        return self._ids[lo:hi]
+
+    def count_between(self, start_date: datetime, end_date: datetime) -> int:
+        """Count records dated within an inclusive range."""
+        lo = bisect_left(self._keys, date_key(start_date))
+        hi = bisect_right(self._keys, date_key(end_date))
+        return max(hi - lo, 0)
+
+
+class LedgerOrder:
+    """Position of each expense record in the order it was first added.
+
+    Updating a record keeps its position, as the storage backends do, so
+    IDs read through another index can be put back into ledger order.
+    """
+
+    def __init__(self, records: Iterable[dict] = ()):
+        """Number the records in the order they are given."""
+        self._positions: Dict[str, int] = {}
+        for record in records:
+            self._positions[record['id']] = len(self._positions)
+        self._next = len(self._positions)
+
+    def __len__(self) -> int:
+        """Get the number of indexed records."""
+        return len(self._positions)
+
+    def add(self, record: dict) -> None:
+        """Give a new record the next position; known records keep theirs."""
+        if record['id'] not in self._positions:
+            self._positions[record['id']] = self._next
+            self._next += 1
+
+    def remove(self, expense_id: str) -> None:
+        """Drop a record if it is present."""
+        self._positions.pop(expense_id, None)
+
+    def sort(self, expense_ids: Iterable[str]) -> List[str]:
+        """Get IDs in ledger order; unknown IDs go last."""
+        positions = self._positions
+        return sorted(expense_ids, key=lambda i: positions.get(i, self._next))
+
+
+class _SortedIds:
+    """IDs kept in ascending order of an integer key, ties in insertion order."""
+
+    def __init__(self):
+        """Initialize an empty list."""
+        self.keys: List[int] = []
+        self.ids: List[str] = []
+
+    def insert(self, key: int, expense_id: str) -> None:
+        """Insert an ID after any others with the same key."""
+        pos = bisect_right(self.keys, key)
+        self.keys.insert(pos, key)
+        self.ids.insert(pos, expense_id)
+
+    def delete(self, key: int, expense_id: str) -> None:
+        """Remove an ID inserted with the given key."""
+        pos = bisect_left(self.keys, key)
+        while self.ids[pos] != expense_id:
+            pos += 1
+        del self.keys[pos]
+        del self.ids[pos]
+
+
+class AmountIndex:
+    """IDs of expense records ordered by amount, overall and per category.
+
+    The largest and smallest K records are read from either end of a
+    sorted list, so they cost O(K) regardless of ledger size. Records with
+    equal amounts keep the order they were added in.
+    """
+
+    def __init__(self, records: Iterable[dict] = ()):
+        """Build the index from expense records."""
+        self._all = _SortedIds()
+        self._by_category: Dict[str, _SortedIds] = {}
+        # id -> (negated cents, category, date key)
+        self._entries: Dict[str, tuple] = {}
+        entries = sorted(
+            ((-round(r['amount'] * 100), r['category'], date_key(r['date']), r['id']) for r in records),
+            key=lambda e: e[0]
+        )
+        for key, category, day, expense_id in entries:
+            self._all.keys.append(key)
+            self._all.ids.append(expense_id)
+            group = self._by_category.setdefault(category, _SortedIds())
+            group.keys.append(key)
+            group.ids.append(expense_id)
+            self._entries[expense_id] = (key, category, day)
+
+    def __len__(self) -> int:
+        """Get the number of indexed records."""
+        return len(self._entries)
+
+    def add(self, record: dict) -> None:
+        """Index a record, replacing any previous entry with the same ID."""
+        self.remove(record['id'])
+        key = -round(record['amount'] * 100)
+        self._all.insert(key, record['id'])
+        self._by_category.setdefault(record['category'], _SortedIds()).insert(key, record['id'])
+        self._entries[record['id']] = (key, record['category'], date_key(record['date']))
+
+    def remove(self, expense_id: str) -> None:
+        """Drop a record from the index if it is present."""
+        entry = self._entries.pop(expense_id, None)
+        if entry is None:
+            return
+        key, category, _ = entry
+        self._all.delete(key, expense_id)
+        self._by_category[category].delete(key, expense_id)
+
+    def ids_by_amount(self, descending: bool = True, category: Optional[str] = None) -> Iterator[str]:
+        """Yield IDs from the largest amount down, or from the smallest up."""
+        ids = self._all.ids if category is None else self._by_category.get(category, _SortedIds()).ids
+        return iter(list(ids) if descending else ids[::-1])
+
+    def _bounds(self, low_cents: Optional[int], high_cents: Optional[int], category: Optional[str]) -> tuple:
+        """Get the ordered IDs and the slice holding amounts within a range."""
+        group = self._all if category is None else self._by_category.get(category, _SortedIds())
+        lo = bisect_left(group.keys, -high_cents) if high_cents is not None else 0
+        hi = bisect_right(group.keys, -low_cents) if low_cents is not None else len(group.keys)
+        return group.ids, lo, max(hi, lo)
+
+    def count_in_range(
+        self,
+        low_cents: Optional[int] = None,
+        high_cents: Optional[int] = None,
+        category: Optional[str] = None
+    ) -> int:
+        """Count records with amounts in an inclusive cents range; None leaves an end open."""
+        _, lo, hi = self._bounds(low_cents, high_cents, category)
+        return hi - lo
+
+    def ids_in_range(
+        self,
+        low_cents: Optional[int] = None,
+        high_cents: Optional[int] = None,
+        category: Optional[str] = None,
+        descending: bool = True
+    ) -> List[str]:
+        """Get IDs of records with amounts in an inclusive cents range, in amount order."""
+        ids, lo, hi = self._bounds(low_cents, high_cents, category)
+        return ids[lo:hi] if descending else ids[lo:hi][::-1]
+
+    def top(
+        self,
+        limit: int,
+        largest: bool = True,
+        category: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> List[str]:
+        """Get the IDs of the ``limit`` largest or smallest records.
+
+        A date range is applied while walking the ordered IDs, so it costs
+        more the smaller the share of records that fall inside it.
+        """
+        ids = self._all.ids if category is None else self._by_category.get(category, _SortedIds()).ids
+        ordered = ids if largest else reversed(ids)
+        if start_date is None and end_date is None:
+            return list(islice(ordered, max(limit, 0)))
+        lo = date_key(start_date) if start_date is not None else None
+        hi = date_key(end_date) if end_date is not None else None
+        result = []
+        for expense_id in ordered:
+            if len(result) >= limit:
+                break
+            day = self._entries[expense_id][2]
+            if (lo is None or day >= lo) and (hi is None or day <= hi):
+                result.append(expense_id)
+        return result
+
+
+class FenwickTree:
+    """Binary indexed tree of integer counts with O(log n) updates and prefix sums."""
+
+    def __init__(self, values: Iterable[int] = ()):
+        """Build the tree over a sequence of values in linear time."""
+        self._tree = [0] + list(values)
+        size = len(self._tree)
+        for i in range(1, size):
+            parent = i + (i & -i)
+            if parent < size:
+                self._tree[parent] += self._tree[i]
+
+    def __len__(self) -> int:
+        """Get the number of positions."""
+        return len(self._tree) - 1
+
+    def add(self, index: int, delta: int) -> None:
+        """Add ``delta`` to the value at a position."""
+        i = index + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix(self, end: int) -> int:
+        """Get the sum of positions ``[0, end)``."""
+        total = 0
+        i = min(end, len(self._tree) - 1)
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def range_sum(self, start: int, end: int) -> int:
+        """Get the sum of positions ``[start, end)``."""
+        if end <= start:
+            return 0
+        return self.prefix(end) - self.prefix(max(start, 0))
+
+    def search(self, target: int) -> int:
+        """Get the first position whose prefix sum through it exceeds ``target``.
+
+        Values must be non-negative. Returns ``len(self)`` if none does.
+        """
+        pos = 0
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            nxt = pos + step
+            if nxt < len(self._tree) and self._tree[nxt] <= target:
+                pos = nxt
+                target -= self._tree[nxt]
+            step >>= 1
+        return pos
+
+
+class DayTotals:
+    """Per-day amount totals in Fenwick trees, overall and per category.
+
+    Days are stored as ordinals counted from an origin; the trees double
+    their span when a record falls outside it. The total for any day range
+    costs O(log n) and the first and last days with records are found by
+    searching a tree of per-day counts.
+    """
+
+    def __init__(self, records: Iterable[dict] = ()):
+        """Build the trees from expense records."""
+        # id -> (day ordinal, category, cents)
+        self._entries: Dict[str, tuple] = {
+            r['id']: (datetime.fromisoformat(r['date']).toordinal(), r['category'], round(r['amount'] * 100))
+            for r in records
+        }
+        days = [day for day, _, _ in self._entries.values()]
+        self._origin = min(days) if days else 0
+        self._rebuild(max(days) - self._origin + 1 if days else 1)
+
+    def __len__(self) -> int:
+        """Get the number of indexed records."""
+        return len(self._entries)
+
+    def _rebuild(self, span: int) -> None:
+        """Rebuild every tree to cover ``span`` days from the origin."""
+        size = 1 << max(span - 1, 0).bit_length()
+        counts = [0] * size
+        cents = [0] * size
+        by_category: Dict[str, List[int]] = {}
+        for day, category, amount in self._entries.values():
+            i = day - self._origin
+            counts[i] += 1
+            cents[i] += amount
+            by_category.setdefault(category, [0] * size)[i] += amount
+        self._size = size
+        self._counts = FenwickTree(counts)
+        self._cents = FenwickTree(cents)
+        self._by_category = {category: FenwickTree(v) for category, v in by_category.items()}
+
+    def _position(self, day: int) -> int:
+        """Get a day's tree position, growing the trees to cover it."""
+        if not self._entries:
+            self._origin = day
+        if day < self._origin:
+            end = self._origin + self._size
+            self._origin = min(day, self._origin - self._size)
+            self._rebuild(end - self._origin)
+        elif day >= self._origin + self._size:
+            self._rebuild(max(day - self._origin + 1, self._size * 2))
+        return day - self._origin
+
+    def add(self, record: dict) -> None:
+        """Index a record, replacing any previous entry with the same ID."""
+        self.remove(record['id'])
+        day = datetime.fromisoformat(record['date']).toordinal()
+        category, amount = record['category'], round(record['amount'] * 100)
+        i = self._position(day)
+        self._entries[record['id']] = (day, category, amount)
+        self._counts.add(i, 1)
+        self._cents.add(i, amount)
+        if category not in self._by_category:
+            self._by_category[category] = FenwickTree([0] * self._size)
+        self._by_category[category].add(i, amount)
+
+    def remove(self, expense_id: str) -> None:
+        """Drop a record from the trees if it is present."""
+        entry = self._entries.pop(expense_id, None)
+        if entry is None:
+            return
+        day, category, amount = entry
+        i = day - self._origin
+        self._counts.add(i, -1)
+        self._cents.add(i, -amount)
+        self._by_category[category].add(i, -amount)
+
+    def total_cents(self, first_day: int, last_day: int, category: Optional[str] = None) -> int:
+        """Get the total in cents of records dated from ``first_day`` to ``last_day`` inclusive."""
+        tree = self._cents if category is None else self._by_category.get(category)
+        if tree is None:
+            return 0
+        return tree.range_sum(first_day - self._origin, last_day - self._origin + 1)
+
+    def count(self, first_day: int, last_day: int) -> int:
+        """Count records dated from ``first_day`` to ``last_day`` inclusive."""
+        return self._counts.range_sum(first_day - self._origin, last_day - self._origin + 1)
+
+    def span(self) -> Optional[tuple]:
+        """Get the first and last day ordinals holding records, or None if empty."""
+        count = self._counts.prefix(self._size)
+        if not count:
+            return None
+        return self._origin + self._counts.search(0), self._origin + self._counts.search(count - 1)
+
+
+class TextIndex:
+    """Inverted index of the words in expense descriptions and notes.
+
+    A query word of ``MIN_PREFIX`` or more characters matches any indexed
+    word it begins, so the last word can still be half typed; shorter
+    query words must match whole words. Every query word must match. Hits
+    are ranked by TF-IDF, where description words count twice as much as
+    note words and a whole-word match counts twice as much as a prefix.
+    """
+
+    FIELD_WEIGHTS = (('description', 2), ('notes', 1))
+    MIN_PREFIX = 2
+
+    def __init__(self, records: Iterable[dict] = ()):
+        """Build the index from expense records."""
+        # token -> {id: weight}; id -> {token: weight}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._entries: Dict[str, Dict[str, int]] = {}
+        for record in records:
+            self._index(record)
+        self._vocabulary: List[str] = sorted(self._postings)
+
+    def __len__(self) -> int:
+        """Get the number of indexed records."""
+        return len(self._entries)
+
+    @classmethod
+    def word_matches(cls, term: str, word: str) -> bool:
+        """Check whether a query word matches an indexed word."""
+        return word == term or (len(term) >= cls.MIN_PREFIX and word.startswith(term))
+
+    def _index(self, record: dict) -> List[str]:
+        """Add a record's words to the postings; return words new to the index."""
+        weights: Dict[str, int] = {}
+        for field, weight in self.FIELD_WEIGHTS:
+            for token in tokenize(record.get(field)):
+                weights[token] = weights.get(token, 0) + weight
+        new_tokens = []
+        for token, weight in weights.items():
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = {}
+                new_tokens.append(token)
+            posting[record['id']] = weight
+        self._entries[record['id']] = weights
+        return new_tokens
+
+    def add(self, record: dict) -> None:
+        """Index a record, replacing any previous entry with the same ID."""
+        self.remove(record['id'])
+        for token in self._index(record):
+            insort(self._vocabulary, token)
+
+    def remove(self, expense_id: str) -> None:
+        """Drop a record from the index if it is present."""
+        weights = self._entries.pop(expense_id, None)
+        if weights is None:
+            return
+        for token in weights:
+            posting = self._postings[token]
+            del posting[expense_id]
+            if not posting:
+                del self._postings[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+
+    def _expand(self, term: str) -> List[str]:
+        """Get the indexed words a query word matches."""
+        if len(term) < self.MIN_PREFIX:
+            return [term] if term in self._postings else []
+        lo = bisect_left(self._vocabulary, term)
+        hi = bisect_left(self._vocabulary, term + "\U0010ffff", lo)
+        return self._vocabulary[lo:hi]
+
+    def _plan(self, query: str) -> List[tuple]:
+        """Get ``(postings, term, words)`` per query word, rarest first; empty if nothing matches."""
+        plan = []
+        for term in dict.fromkeys(tokenize(query)):
+            expanded = self._expand(term)
+            size = sum(len(self._postings[t]) for t in expanded)
+            if not size:
+                return []
+            plan.append((size, term, expanded))
+        plan.sort(key=lambda p: p[0])
+        return plan
+
+    def estimate(self, query: str) -> int:
+        """Get an upper bound on the number of records matching a query."""
+        plan = self._plan(query)
+        return plan[0][0] if plan else 0
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """Get IDs of records matching every query word, most relevant first.
+
+        Scores are accumulated along the postings of the rarest word first,
+        and later words only touch records that are still candidates: by
+        walking their postings, or by checking each candidate's own words
+        when there are fewer candidates than postings.
+        """
+        total = len(self._entries)
+        scores: Optional[Dict[str, float]] = None
+        for size, term, expanded in self._plan(query):
+            matched: Dict[str, float] = {}
+            if scores is not None and len(scores) < size:
+                # Fewer candidates than postings: check each candidate's words
+                for expense_id, score in scores.items():
+                    for token, weight in self._entries[expense_id].items():
+                        if self.word_matches(term, token):
+                            boost = math.log(1 + total / len(self._postings[token])) * (2 if token == term else 1)
+                            score += weight * boost
+                            matched[expense_id] = score
+            else:
+                for token in expanded:
+                    posting = self._postings[token]
+                    boost = math.log(1 + total / len(posting)) * (2 if token == term else 1)
+                    if scores is None:
+                        for expense_id, weight in posting.items():
+                            matched[expense_id] = matched.get(expense_id, 0) + weight * boost
+                    else:
+                        for expense_id, weight in posting.items():
+                            if expense_id in scores:
+                                matched[expense_id] = matched.get(expense_id, scores[expense_id]) + weight * boost
+            scores = matched
+            if not scores:
+                break
+        if not scores:
+            return []
+        ranked = ((-score, position, expense_id) for position, (expense_id, score) in enumerate(scores.items()))
+        ranked = heapq.nsmallest(limit, ranked) if limit is not None else sorted(ranked)
+        return [expense_id for _, _, expense_id in ranked]
+
+
+class TrigramIndex:
+    """Index of the three-character substrings of expense descriptions.
+
+    Each record gets a row number and each trigram a sorted array of the
+    rows containing it. A substring search walks the rarest trigram's
+    rows and keeps those found in every other trigram's array, leaving
+    candidates the caller checks for the actual substring. Queries
+    shorter than three characters take the union of the trigrams that
+    contain them, plus every description too short to have a trigram.
+    Matching ignores case.
+
+    Updated records take a new row and deleted rows are only marked
+    dead; the arrays are compacted once dead rows outnumber live ones.
+    """
+
+    def __init__(self, records: Iterable[dict] = ()):
+        """Build the index from expense records."""
+        self._postings: Dict[str, array] = {}
+        self._short = array('I')
+        # row -> id, or None once the row is dead
+        self._ids: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        for record in records:
+            self._append(record)
+
+    def __len__(self) -> int:
+        """Get the number of indexed records."""
+        return len(self._rows)
+
+    @staticmethod
+    def trigrams(text: Optional[str]) -> set:
+        """Get the lowercase trigrams of a text."""
+        text = (text or '').lower()
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def _append(self, record: dict) -> None:
+        """Give a record the next row and add it to its trigrams' arrays."""
+        row = len(self._ids)
+        self._ids.append(record['id'])
+        self._rows[record['id']] = row
+        grams = self.trigrams(record.get('description'))
+        if not grams:
+            self._short.append(row)
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if posting is None:
+                posting = self._postings[gram] = array('I')
+            posting.append(row)
+
+    def add(self, record: dict) -> None:
+        """Index a record, replacing any previous entry with the same ID."""
+        self.remove(record['id'])
+        self._append(record)
+
+    def remove(self, expense_id: str) -> None:
+        """Drop a record from the index if it is present."""
+        row = self._rows.pop(expense_id, None)
+        if row is None:
+            return
+        self._ids[row] = None
+        if len(self._ids) > 2 * len(self._rows) + 1024:
+            self._compact()
+
+    def _compact(self) -> None:
+        """Renumber live rows and drop dead ones from every array."""
+        remap = {}
+        ids = []
+        for row, expense_id in enumerate(self._ids):
+            if expense_id is not None:
+                remap[row] = len(ids)
+                ids.append(expense_id)
+        for gram in list(self._postings):
+            posting = array('I', [remap[r] for r in self._postings[gram] if r in remap])
+            if posting:
+                self._postings[gram] = posting
+            else:
+                del self._postings[gram]
+        self._short = array('I', [remap[r] for r in self._short if r in remap])
+        self._ids = ids
+        self._rows = {expense_id: row for row, expense_id in enumerate(ids)}
+
+    def _postings_for(self, substring: str) -> List[array]:
+        """Get the row arrays a lowercase substring's matches must come from."""
+        if len(substring) >= 3:
+            return [self._postings.get(gram, array('I')) for gram in self.trigrams(substring)]
+        return [self._short] + [p for gram, p in self._postings.items() if substring in gram]
+
+    def estimate(self, substring: str) -> int:
+        """Get an upper bound on the number of records containing a substring."""
+        substring = substring.lower()
+        postings = self._postings_for(substring)
+        if len(substring) >= 3:
+            return min(len(p) for p in postings)
+        # A row can hold several of the trigrams, so the sum may overcount
+        return min(sum(len(p) for p in postings), len(self._rows))
+
+    def candidates(self, substring: str) -> List[str]:
+        """Get IDs of records that may contain a substring, in row order.
+
+        Every record containing the substring is returned; some returned
+        records may not contain it.
+        """
+        substring = substring.lower()
+        postings = self._postings_for(substring)
+        if len(substring) < 3:
+            rows = sorted({row for posting in postings for row in posting})
+        else:
+            postings.sort(key=len)
+            rarest, others = postings[0], postings[1:]
+            rows = []
+            for row in rarest:
+                for posting in others:
+                    pos = bisect_left(posting, row)
+                    if pos == len(posting) or posting[pos] != row:
+                        break
+                else:
+                    rows.append(row)
+        ids = self._ids
+        return [ids[row] for row in rows if ids[row] is not None]
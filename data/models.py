@@ -4,6 +4,7 @@ Data models for expense management and accounting.
 
 from dataclasses import dataclass, field
 from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
 from typing import List, Optional
 from enum import Enum
 
@@ -33,20 +34,100 @@ class PaymentMethod(Enum):
     OTHER = "Other"
 
 
-@dataclass
+def to_cents(amount) -> int:
+    """Convert an amount in currency units to integer cents, rounding half up."""
+    if isinstance(amount, int):
+        return amount * 100
+    cents = Decimal(str(amount)) * 100
+    return int(cents.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+_CATEGORIES = {c.value: c for c in ExpenseCategory}
+_PAYMENT_METHODS = {m.value: m for m in PaymentMethod}
+
+
+@dataclass(frozen=True, init=False)
 class Expense:
-    """Model for individual expense records."""
+    """Model for individual expense records.
+
+    Expenses are immutable and slotted. The amount is held as integer cents
+    so sums are exact; ``amount`` gives it back in currency units.
+    """
+    # Declared by hand: dataclass(slots=True) needs Python 3.10
+    __slots__ = (
+        'id', 'description', 'amount_cents', 'category', 'payment_method', 'date',
+        'notes', 'receipt_path', 'is_reimbursable', 'created_at', 'updated_at',
+    )
     id: str
     description: str
-    amount: float
+    amount_cents: int
     category: ExpenseCategory
     payment_method: PaymentMethod
     date: datetime
-    notes: Optional[str] = None
-    receipt_path: Optional[str] = None
-    is_reimbursable: bool = False
-    created_at: datetime = field(default_factory=datetime.now)
-    updated_at: datetime = field(default_factory=datetime.now)
+    notes: Optional[str]
+    receipt_path: Optional[str]
+    is_reimbursable: bool
+    created_at: datetime
+    updated_at: datetime
+
+    def __init__(
+        self,
+        id: str,
+        description: str,
+        amount=None,
+        category: Optional[ExpenseCategory] = None,
+        payment_method: Optional[PaymentMethod] = None,
+        date: Optional[datetime] = None,
+        notes: Optional[str] = None,
+        receipt_path: Optional[str] = None,
+        is_reimbursable: bool = False,
+        created_at: Optional[datetime] = None,
+        updated_at: Optional[datetime] = None,
+        *,
+        amount_cents: Optional[int] = None
+    ):
+        """Initialize expense from an amount in currency units or in cents."""
+        if amount_cents is None:
+            if amount is None:
+                raise TypeError("Expense requires amount or amount_cents")
+            amount_cents = to_cents(amount)
+        if category is None or payment_method is None:
+            raise TypeError("Expense requires category and payment_method")
+        now = datetime.now()
+        init = object.__setattr__
+        init(self, 'id', id)
+        init(self, 'description', description)
+        init(self, 'amount_cents', int(amount_cents))
+        init(self, 'category', ExpenseCategory(category))
+        init(self, 'payment_method', PaymentMethod(payment_method))
+        init(self, 'date', date or now)
+        init(self, 'notes', notes)
+        init(self, 'receipt_path', receipt_path)
+        init(self, 'is_reimbursable', bool(is_reimbursable))
+        init(self, 'created_at', created_at or now)
+        init(self, 'updated_at', updated_at or now)
+
+    def __getstate__(self) -> dict:
+        """Get the field values for pickling and copying."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state: dict) -> None:
+        """Restore field values, bypassing the frozen ``__setattr__``."""
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+    @property
+    def amount(self) -> float:
+        """Get the amount in currency units."""
+        return self.amount_cents / 100
+
+    def replace(self, **changes) -> "Expense":
+        """Get a copy of the expense with some fields changed."""
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        if 'amount' in changes:
+            fields.pop('amount_cents')
+        fields.update(changes)
+        return Expense(**fields)
 
     def to_dict(self) -> dict:
         """Convert expense to dictionary."""
@@ -64,6 +145,31 @@ class Expense:
             'updated_at': self.updated_at.isoformat(),
         }
 
+    @classmethod
+    def from_dict(cls, data: dict) -> "Expense":
+        """Create expense from dictionary."""
+        created_at = data.get('created_at')
+        updated_at = data.get('updated_at')
+        created = datetime.fromisoformat(created_at) if created_at else None
+        # Unedited expenses share one timestamp object
+        updated = created if updated_at == created_at else (
+            datetime.fromisoformat(updated_at) if updated_at else None
+        )
+        return cls(
+            id=data['id'],
+            description=data['description'],
+            amount_cents=to_cents(data['amount']),
+            # Unknown values fall through to the enum, which raises ValueError
+            category=_CATEGORIES.get(data['category']) or ExpenseCategory(data['category']),
+            payment_method=_PAYMENT_METHODS.get(data['payment_method']) or PaymentMethod(data['payment_method']),
+            date=datetime.fromisoformat(data['date']),
+            notes=data.get('notes'),
+            receipt_path=data.get('receipt_path'),
+            is_reimbursable=data.get('is_reimbursable', False),
+            created_at=created,
+            updated_at=updated
+        )
+
 
 @dataclass
 class ExpenseReport:
@@ -75,18 +181,25 @@ class ExpenseReport:
     expenses: List[Expense] = field(default_factory=list)
     notes: Optional[str] = None
     created_at: datetime = field(default_factory=datetime.now)
+    # (id of the expenses list, its length, total cents) when last summed
+    _total: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
 
     def add_expense(self, expense: Expense) -> None:
         """Add expense to report."""
         self.expenses.append(expense)
+        if self._total is not None and self._total[:2] == (id(self.expenses), len(self.expenses) - 1):
+            self._total = (id(self.expenses), len(self.expenses), self._total[2] + expense.amount_cents)
 
     def remove_expense(self, expense_id: str) -> None:
         """Remove expense from report by ID."""
         self.expenses = [e for e in self.expenses if e.id != expense_id]
 
     def get_total(self) -> float:
-        """Get total expenses in report."""
-        return sum(expense.amount for expense in self.expenses)
+        """Get total expenses in report, re-summed when the expenses list is replaced or resized."""
+        key = (id(self.expenses), len(self.expenses))
+        if self._total is None or self._total[:2] != key:
+            self._total = key + (sum(expense.amount_cents for expense in self.expenses),)
+        return self._total[2] / 100
 
     def get_by_category(self) -> dict:
         """Get expenses grouped by category."""
@@ -102,7 +215,7 @@ class ExpenseReport:
         """Get total amount per category."""
         totals = {}
         for category, expenses in self.get_by_category().items():
-            totals[category] = sum(e.amount for e in expenses)
+            totals[category] = sum(e.amount_cents for e in expenses) / 100
         return totals
 
 
@@ -0,0 +1,104 @@
+"""
+Composable expense queries.
+
+An ``ExpenseQuery`` combines predicates on date, category, payment
+method, amount, the reimbursable flag, description text and full-text
+search terms with an optional sort order and page.
+``DatabaseManager.query_expenses`` plans each query against the
+available indexes and streams the matches.
+"""
+
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import List, Optional
+from .indexes import TextIndex, tokenize
+from .models import ExpenseCategory, PaymentMethod
+
+SORT_FIELDS = ('date', 'amount', 'description', 'relevance')
+
+
+@dataclass(frozen=True)
+class ExpenseQuery:
+    """Immutable set of expense predicates with sorting and paging."""
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    category: Optional[ExpenseCategory] = None
+    payment_method: Optional[PaymentMethod] = None
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+    is_reimbursable: Optional[bool] = None
+    text: Optional[str] = None
+    terms: Optional[str] = None
+    sort_by: Optional[str] = None
+    descending: bool = False
+    limit: Optional[int] = None
+    offset: int = 0
+
+    def __post_init__(self):
+        """Validate the sort field and page."""
+        if self.sort_by is not None and self.sort_by not in SORT_FIELDS:
+            raise ValueError(f"Unknown sort field: {self.sort_by}")
+        if self.sort_by == 'relevance' and not self.words():
+            raise ValueError("Sorting by relevance needs search terms")
+        if self.offset < 0 or (self.limit is not None and self.limit < 0):
+            raise ValueError("limit and offset must not be negative")
+
+    def where(self, **predicates) -> "ExpenseQuery":
+        """Get a copy of the query with predicates added or replaced."""
+        return replace(self, **predicates)
+
+    def order_by(self, field: str, descending: bool = False) -> "ExpenseQuery":
+        """Get a copy of the query sorted by ``date``, ``amount``, ``description`` or ``relevance``.
+
+        Relevance is always most relevant first and needs ``terms``.
+        """
+        return replace(self, sort_by=field, descending=descending)
+
+    def page(self, limit: Optional[int], offset: int = 0) -> "ExpenseQuery":
+        """Get a copy of the query returning at most ``limit`` rows after ``offset``."""
+        return replace(self, limit=limit, offset=offset)
+
+    def words(self) -> List[str]:
+        """Get the full-text search words of ``terms``."""
+        return tokenize(self.terms)
+
+    def amount_bounds(self) -> tuple:
+        """Get the amount range in cents, with None for an open end."""
+        low = round(self.min_amount * 100) if self.min_amount is not None else None
+        high = round(self.max_amount * 100) if self.max_amount is not None else None
+        return low, high
+
+    def matches(self, record: dict) -> bool:
+        """Check whether an expense record satisfies every predicate."""
+        if self.category is not None and record['category'] != self.category.value:
+            return False
+        if self.payment_method is not None and record['payment_method'] != self.payment_method.value:
+            return False
+        if self.is_reimbursable is not None and bool(record.get('is_reimbursable')) != self.is_reimbursable:
+            return False
+        low, high = self.amount_bounds()
+        if low is not None or high is not None:
+            cents = round(record['amount'] * 100)
+            if (low is not None and cents < low) or (high is not None and cents > high):
+                return False
+        if self.start_date is not None or self.end_date is not None:
+            day = datetime.fromisoformat(record['date'])
+            if (self.start_date is not None and day < self.start_date) or \
+                    (self.end_date is not None and day > self.end_date):
+                return False
+        if self.text and self.text.lower() not in record['description'].lower():
+            return False
+        terms = self.words()
+        if terms:
+            words = tokenize(record['description']) + tokenize(record.get('notes'))
+            if not all(any(TextIndex.word_matches(term, w) for w in words) for term in terms):
+                return False
+        return True
+
+    def sort_key(self, record: dict):
+        """Get the value a record is ordered by."""
+        if self.sort_by == 'date':
+            return datetime.fromisoformat(record['date'])
+        if self.sort_by == 'amount':
+            return round(record['amount'] * 100)
+        return record['description'].lower()
@@ -0,0 +1,144 @@
+"""
+Mergeable streaming quantile sketch for expense amounts.
+
+Values are counted in logarithmic buckets whose width grows with the
+value, so any quantile can be read back with a bounded *relative* error
+(1% by default) from a few hundred counters, however many expenses the
+ledger holds. Because buckets are plain counts, values can be removed as
+well as added, and two sketches with the same accuracy merge by adding
+their counts.
+"""
+
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def log_histogram(values: Iterable[Tuple[float, int]], bins_per_decade: int = 1) -> List[dict]:
+    """Count ``(value, count)`` pairs in logarithmic bins.
+
+    Each bin spans a ``10 ** (1 / bins_per_decade)`` ratio and is returned
+    as ``{'low', 'high', 'count'}`` in ascending order. Zero and negative
+    values are counted in a leading bin with ``low`` of None and ``high``
+    of 0.
+    """
+    bins: Dict[int, int] = {}
+    non_positive = 0
+    for value, count in values:
+        if value <= 0:
+            non_positive += count
+            continue
+        index = math.floor(math.log10(value) * bins_per_decade)
+        bins[index] = bins.get(index, 0) + count
+    histogram = [{'low': None, 'high': 0, 'count': non_positive}] if non_positive else []
+    for index in sorted(bins):
+        histogram.append({
+            'low': 10 ** (index / bins_per_decade),
+            'high': 10 ** ((index + 1) / bins_per_decade),
+            'count': bins[index],
+        })
+    return histogram
+
+
+class QuantileSketch:
+    """Log-bucket quantile sketch over integer amounts such as cents."""
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        """Initialize an empty sketch."""
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def _key(self, value: float) -> int:
+        """Get the bucket holding a positive value."""
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        """Get the representative value of a bucket."""
+        return 2 * self._gamma ** key / (self._gamma + 1)
+
+    def add(self, value: float, count: int = 1) -> None:
+        """Count a value."""
+        if value > 0:
+            key = self._key(value)
+            self.positive[key] = self.positive.get(key, 0) + count
+        elif value < 0:
+            key = self._key(-value)
+            self.negative[key] = self.negative.get(key, 0) + count
+        else:
+            self.zero_count += count
+        self.count += count
+
+    def remove(self, value: float, count: int = 1) -> None:
+        """Uncount a value that was added earlier."""
+        if value == 0:
+            self.zero_count -= count
+        else:
+            store = self.positive if value > 0 else self.negative
+            key = self._key(abs(value))
+            remaining = store.get(key, 0) - count
+            if remaining > 0:
+                store[key] = remaining
+            else:
+                store.pop(key, None)
+        self.count -= count
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """Add another sketch's counts to this one."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for store, theirs in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in theirs.items():
+                store[key] = store.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def _buckets(self) -> List[tuple]:
+        """Get (value, count) pairs in ascending value order."""
+        buckets = [(-self._value(k), self.negative[k]) for k in sorted(self.negative, reverse=True)]
+        if self.zero_count:
+            buckets.append((0.0, self.zero_count))
+        buckets.extend((self._value(k), self.positive[k]) for k in sorted(self.positive))
+        return buckets
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the q-quantile (0 <= q <= 1), or None if the sketch is empty."""
+        if self.count <= 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for value, count in self._buckets():
+            seen += count
+            if seen > rank:
+                return value
+        return self._buckets()[-1][0]
+
+    def histogram(self, bins_per_decade: int = 1, scale: float = 1) -> List[dict]:
+        """Get counts in logarithmic bins of the values divided by ``scale``."""
+        return log_histogram(
+            ((value / scale, count) for value, count in self._buckets()), bins_per_decade
+        )
+
+    def to_dict(self) -> dict:
+        """Convert sketch to a JSON-serializable dictionary."""
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'positive': [[k, c] for k, c in self.positive.items()],
+            'negative': [[k, c] for k, c in self.negative.items()],
+            'zero_count': self.zero_count,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuantileSketch":
+        """Create sketch from dictionary."""
+        sketch = cls(data['relative_accuracy'])
+        sketch.positive = {k: c for k, c in data['positive']}
+        sketch.negative = {k: c for k, c in data['negative']}
+        sketch.zero_count = data['zero_count']
+        sketch.count = sketch.zero_count + sum(sketch.positive.values()) + sum(sketch.negative.values())
+        return sketch
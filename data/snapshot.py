@@ -0,0 +1,156 @@
+"""
+Columnar binary snapshot of the expense ledger for analytics.
+
+The snapshot stores one packed array per column in a single file that is
+memory-mapped when opened, so analytics can aggregate over the mapped
+buffers without parsing JSON or building a dictionary per expense.
+
+File layout::
+
+    b'SAKICOL1'                  magic
+    uint32                       length of the JSON header
+    header                       rows, signature, code tables, column offsets
+    padding to 8 bytes
+    columns                      each padded to 8 bytes
+
+Amounts are stored as integer cents, dates as day ordinals, and category
+and payment method as codes into the header's value tables.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+MAGIC = b'SAKICOL1'
+
+COLUMNS = (
+    ('amount_cents', 'q'),
+    ('date', 'i'),
+    ('category', 'B'),
+    ('payment_method', 'B'),
+    ('is_reimbursable', 'B'),
+)
+
+
+def _align(offset: int) -> int:
+    """Round an offset up to the next multiple of 8."""
+    return (offset + 7) & ~7
+
+
+def build_columns(records: Iterable[dict]) -> tuple:
+    """Convert expense records into column arrays and code tables."""
+    columns = {name: array(typecode) for name, typecode in COLUMNS}
+    categories: Dict[str, int] = {}
+    methods: Dict[str, int] = {}
+    amounts, dates = columns['amount_cents'], columns['date']
+    category_codes, method_codes = columns['category'], columns['payment_method']
+    reimbursable = columns['is_reimbursable']
+    for record in records:
+        amounts.append(round(record['amount'] * 100))
+        dates.append(datetime.fromisoformat(record['date']).toordinal())
+        category_codes.append(categories.setdefault(record['category'], len(categories)))
+        method_codes.append(methods.setdefault(record['payment_method'], len(methods)))
+        reimbursable.append(1 if record.get('is_reimbursable') else 0)
+    return columns, list(categories), list(methods)
+
+
+def write_snapshot(path: Path, records: Iterable[dict], signature: Optional[str] = None) -> None:
+    """Write records to a columnar snapshot file atomically."""
+    columns, categories, methods = build_columns(records)
+    if len(categories) > 256 or len(methods) > 256:
+        raise ValueError("Too many distinct categories or payment methods for a snapshot")
+
+    layout = []
+    offset = 0
+    for name, typecode in COLUMNS:
+        layout.append({'name': name, 'typecode': typecode, 'offset': offset})
+        offset = _align(offset + len(columns[name]) * columns[name].itemsize)
+    header = json.dumps({
+        'rows': len(columns['amount_cents']),
+        'signature': signature,
+        'byteorder': sys.byteorder,
+        'categories': categories,
+        'payment_methods': methods,
+        'columns': layout,
+    }).encode('utf-8')
+
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(MAGIC + struct.pack('<I', len(header)) + header)
+            f.write(b'\0' * (_align(f.tell()) - f.tell()))
+            for name, _ in COLUMNS:
+                column = columns[name]
+                column.tofile(f)
+                size = len(column) * column.itemsize
+                f.write(b'\0' * (_align(size) - size))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class ColumnarSnapshot:
+    """Read-only, memory-mapped view of a columnar snapshot file.
+
+    Column views stay valid until ``close`` is called.
+    """
+
+    def __init__(self, path: Path):
+        """Open and map a snapshot file."""
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mmap)
+        try:
+            if bytes(buffer[:8]) != MAGIC:
+                raise ValueError(f"Not a columnar snapshot: {self.path}")
+            header_len, = struct.unpack('<I', buffer[8:12])
+            header = json.loads(bytes(buffer[12:12 + header_len]))
+        finally:
+            buffer.release()
+        if header['byteorder'] != sys.byteorder:
+            self.close()
+            raise ValueError(f"Snapshot was written with {header['byteorder']}-endian columns")
+        self.rows: int = header['rows']
+        self.signature: Optional[str] = header['signature']
+        self.categories: List[str] = header['categories']
+        self.payment_methods: List[str] = header['payment_methods']
+        self._data_start = _align(12 + header_len)
+        self._layout = {c['name']: c for c in header['columns']}
+        self._views: Dict[str, memoryview] = {}
+
+    def column(self, name: str) -> memoryview:
+        """Get a typed view over one column, shared by every caller."""
+        view = self._views.get(name)
+        if view is None:
+            spec = self._layout[name]
+            itemsize = array(spec['typecode']).itemsize
+            start = self._data_start + spec['offset']
+            view = memoryview(self._mmap)[start:start + self.rows * itemsize].cast(spec['typecode'])
+            self._views[name] = view
+        return view
+
+    def close(self) -> None:
+        """Release column views and unmap the file."""
+        for view in self._views.values():
+            view.release()
+        self._views = {}
+        try:
+            self._mmap.close()
+        except BufferError:
+            # A caller still holds a derived buffer; let GC unmap it.
+            pass
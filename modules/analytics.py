@@ -2,136 +2,419 @@
 Analytics and reporting module for expense data insights.
 """
 
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+import copy
+import functools
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from types import MappingProxyType
+from typing import List, Dict, Mapping, Optional, Tuple
+from data.cube import shift_month
 from data.database import DatabaseManager
+from data.frame import ExpenseFrame
+from data.models import Company, ExpenseCategory
+from data.sketch import log_histogram
+
+TREND_PERIODS = ('week', 'month', 'quarter', 'fiscal_year')
+
+
+def _add_months(day: date, months: int) -> date:
+    """Get the first day of the month ``months`` after ``day``'s month."""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def period_start(day: date, period: str, fiscal_year_start: int = 1) -> date:
+    """Get the first day of the trend period containing ``day``."""
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    if period == 'month':
+        return day.replace(day=1)
+    if period == 'quarter':
+        return date(day.year, (day.month - 1) // 3 * 3 + 1, 1)
+    if period == 'fiscal_year':
+        year = day.year if day.month >= fiscal_year_start else day.year - 1
+        return date(year, fiscal_year_start, 1)
+    raise ValueError(f"Unknown trend period: {period}")
+
+
+def next_period(start: date, period: str) -> date:
+    """Get the first day of the period after the one starting at ``start``."""
+    if period == 'week':
+        return start + timedelta(days=7)
+    return _add_months(start, {'month': 1, 'quarter': 3, 'fiscal_year': 12}[period])
+
+
+def period_label(start: date, period: str) -> str:
+    """Label a period: ``2024-W07``, ``2024-02``, ``2024-Q1`` or ``FY2024``.
+
+    Fiscal years are named after the calendar year they end in.
+    """
+    if period == 'week':
+        iso_year, iso_week, _ = start.isocalendar()
+        return f"{iso_year}-W{iso_week:02d}"
+    if period == 'month':
+        return f"{start.year}-{start.month:02d}"
+    if period == 'quarter':
+        return f"{start.year}-Q{(start.month - 1) // 3 + 1}"
+    return f"FY{(next_period(start, period) - timedelta(days=1)).year}"
+
+
+def _freeze(value):
+    """Wrap dictionaries and lists in read-only views, recursively."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+_MISSING = object()
+
+
+class ResultCache:
+    """Bounded least-recently-used cache of computed results with hit and miss counters."""
+
+    def __init__(self, maxsize: int = 128):
+        """Initialize an empty cache holding at most ``maxsize`` results."""
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Get a cached result, counting a hit or a miss."""
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value) -> None:
+        """Store a result, evicting the least recently used one when full."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached result and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Get hit and miss counts along with the current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+            }
+
+
+def _memoized(method):
+    """Cache an ``ExpenseAnalytics`` method by its arguments and the ledger version.
+
+    Mutable results are copied on the way out so callers cannot alter
+    the cached value. Calls with unhashable arguments are not cached.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            key = (method.__name__, args, tuple(sorted(kwargs.items())),
+                   self.fiscal_year_start, self.db.ledger_version())
+            hash(key)
+        except TypeError:
+            return method(self, *args, **kwargs)
+        result = self.cache.get(key, _MISSING)
+        if result is _MISSING:
+            result = method(self, *args, **kwargs)
+            self.cache.put(key, result)
+        return copy.deepcopy(result) if isinstance(result, (dict, list)) else result
+    return wrapper
+
+
+@dataclass(frozen=True)
+class AnalyticsSnapshot:
+    """Immutable set of dashboard metrics computed from one ledger pass."""
+    statistics: Mapping[str, float]
+    daily_average: float
+    reimbursable_total: float
+    category_distribution: Mapping[str, Mapping]
+    payment_method_distribution: Mapping[str, Mapping]
+    top_expenses: Tuple[Mapping, ...]
+    generated_at: datetime = field(default_factory=datetime.now)
 
 
 class ExpenseAnalytics:
     """Provides analytics and insights on expense data."""
 
-    def __init__(self, db_manager: DatabaseManager):
-        """Initialize analytics module."""
+    def __init__(
+        self,
+        db_manager: DatabaseManager,
+        company: Optional[Company] = None,
+        cache_size: int = 128
+    ):
+        """Initialize analytics module.
+
+        The company's ``fiscal_year_start`` sets where fiscal-year trend
+        periods begin. Results are cached for up to ``cache_size`` distinct
+        calls and reused until the ledger version changes.
+        """
         self.db = db_manager
+        self.fiscal_year_start = company.fiscal_year_start if company else 1
+        self.cache = ResultCache(cache_size)
+
+    def cache_stats(self) -> dict:
+        """Get hit and miss counts of the result cache."""
+        return self.cache.stats()
 
     def get_monthly_trend(self, months: int = 12) -> dict:
-        """Get monthly expense trends."""
-        trends = {}
-        for i in range(months, 0, -1):
-            date = datetime.now() - timedelta(days=30*i)
-            year, month = date.year, date.month
-            month_key = f"{year}-{month:02d}"
-            expenses = self.db.get_expenses_by_date_range(
-                datetime(year, month, 1),
-                datetime(year, month + 1, 1) - timedelta(days=1)
-                if month < 12 else datetime(year + 1, 1, 1) - timedelta(days=1)
-            )
-            trends[month_key] = sum(e['amount'] for e in expenses)
-        return trends
+        """Get monthly expense trends for the last calendar months, ending with the current one."""
+        return self.get_trend('month', months)
 
-    def get_category_distribution(self) -> dict:
-        """Get distribution of expenses by category."""
-        expenses = self.db.get_expenses()
-        distribution = {}
-        total = sum(e['amount'] for e in expenses)
+    def get_trend(
+        self,
+        period: str = 'month',
+        periods: int = 12,
+        end: Optional[datetime] = None,
+        fiscal_year_start: Optional[int] = None
+    ) -> dict:
+        """Get expense totals per period, oldest first, ending with the period containing ``end``.
 
-        for expense in expenses:
-            category = expense['category']
-            if category not in distribution:
-                distribution[category] = {'amount': 0, 'count': 0}
-            distribution[category]['amount'] += expense['amount']
-            distribution[category]['count'] += 1
+        ``period`` is one of ``TREND_PERIODS``. Months, quarters and fiscal
+        years are rolled up from the aggregate cube; ISO weeks are bucketed
+        in one pass over the expense frame. Whole days are counted, so
+        expenses late on a period's last day are included.
+        """
+        if period not in TREND_PERIODS:
+            raise ValueError(f"Unknown trend period: {period}")
+        if periods < 1:
+            return {}
+        return self._trend(period, periods, (end or datetime.now()).date(),
+                           fiscal_year_start or self.fiscal_year_start)
 
-        for category in distribution:
-            percentage = (distribution[category]['amount'] / total * 100) if total > 0 else 0
-            distribution[category]['percentage'] = round(percentage, 2)
+    @_memoized
+    def _trend(self, period: str, periods: int, end_day: date, fiscal_year_start: int) -> dict:
+        """Get expense totals per period ending with the one containing ``end_day``."""
+        starts = [period_start(end_day, period, fiscal_year_start)]
+        for _ in range(periods - 1):
+            starts.append(period_start(starts[-1] - timedelta(days=1), period, fiscal_year_start))
+        starts.reverse()
+        edges = starts + [next_period(starts[-1], period)]
 
+        if period == 'week':
+            cents = self.db.get_expense_frame().bucket_totals([d.toordinal() for d in edges])
+        else:
+            first_month, last_month = f"{edges[0]:%Y-%m}", f"{edges[-1] - timedelta(days=1):%Y-%m}"
+            monthly = self.db.get_aggregate_cube().totals(('month',), first_month, last_month)
+            cents = []
+            for start, stop in zip(edges, edges[1:]):
+                month, stop_month = f"{start:%Y-%m}", f"{stop:%Y-%m}"
+                total = 0
+                while month < stop_month:
+                    if month in monthly:
+                        total += round(monthly[month]['total'] * 100)
+                    month = shift_month(month, 1)
+                cents.append(total)
+
+        return {period_label(start, period): total / 100 for start, total in zip(starts, cents)}
+
+    def _distribution(self, column: str) -> dict:
+        """Get amount, count and percentage per value of a cube field."""
+        totals = self.db.get_aggregate_cube().totals((column,))
+        total = sum(t['total'] for t in totals.values())
+
+        distribution = {}
+        for label, data in totals.items():
+            percentage = (data['total'] / total * 100) if total > 0 else 0
+            distribution[label] = {
+                'amount': data['total'],
+                'count': data['count'],
+                'percentage': round(percentage, 2)
+            }
         return distribution
 
+    @_memoized
+    def get_category_distribution(self) -> dict:
+        """Get distribution of expenses by category."""
+        return self._distribution('category')
+
+    @_memoized
     def get_payment_method_distribution(self) -> dict:
         """Get distribution by payment method."""
-        expenses = self.db.get_expenses()
-        distribution = {}
-        total = sum(e['amount'] for e in expenses)
+        return self._distribution('payment_method')
 
-        for expense in expenses:
-            method = expense['payment_method']
-            if method not in distribution:
-                distribution[method] = {'amount': 0, 'count': 0}
-            distribution[method]['amount'] += expense['amount']
-            distribution[method]['count'] += 1
+    @_memoized
+    def get_top_expenses(
+        self,
+        limit: int = 10,
+        category: Optional[ExpenseCategory] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> List[dict]:
+        """Get top expenses by amount."""
+        return self.db.get_top_expenses(limit, category, start_date, end_date)
 
-        for method in distribution:
-            percentage = (distribution[method]['amount'] / total * 100) if total > 0 else 0
-            distribution[method]['percentage'] = round(percentage, 2)
+    @_memoized
+    def get_bottom_expenses(
+        self,
+        limit: int = 10,
+        category: Optional[ExpenseCategory] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> List[dict]:
+        """Get the smallest expenses by amount."""
+        return self.db.get_top_expenses(limit, category, start_date, end_date, largest=False)
 
-        return distribution
+    @_memoized
+    def get_expense_statistics(self, exact: bool = False) -> dict:
+        """Get statistical summary of expenses.
 
-    def get_top_expenses(self, limit: int = 10) -> List[dict]:
-        """Get top expenses by amount."""
-        expenses = self.db.get_expenses()
-        sorted_expenses = sorted(expenses, key=lambda x: x['amount'], reverse=True)
-        return sorted_expenses[:limit]
-
-    def get_expense_statistics(self) -> dict:
-        """Get statistical summary of expenses."""
-        expenses = self.db.get_expenses()
-        if not expenses:
-            return {
-                'total': 0,
-                'count': 0,
-                'average': 0,
-                'min': 0,
-                'max': 0,
-                'median': 0
-            }
+        Totals, count, min and max are always exact. Median, p90 and p99
+        come from the aggregate cube's quantile sketch (within 1% of the
+        true value) unless ``exact`` is set, which sorts every amount.
+        """
+        return self._expense_statistics(exact)
+
+    def _expense_statistics(self, exact: bool) -> dict:
+        """Get the statistical summary, exact or from the quantile sketch."""
+        if exact:
+            return self._statistics(self.db.get_expense_frame())
+        return self._sketch_statistics()
 
-        amounts = [e['amount'] for e in expenses]
-        amounts_sorted = sorted(amounts)
-        total = sum(amounts)
-        count = len(amounts)
+    def _empty_statistics(self) -> dict:
+        """Get the statistics reported for an empty ledger."""
+        return {
+            'total': 0,
+            'count': 0,
+            'average': 0,
+            'min': 0,
+            'max': 0,
+            'median': 0,
+            'p90': 0,
+            'p99': 0
+        }
+
+    def _sketch_statistics(self) -> dict:
+        """Get statistics from the cube's totals and quantile sketch."""
+        cube = self.db.get_aggregate_cube()
+        overall = cube.totals(()).get(())
+        if not overall or not overall['count']:
+            return self._empty_statistics()
+        count = overall['count']
+        sketch = cube.sketch
+
+        def quantile(q: float) -> float:
+            # Keep estimates inside the exact range
+            return min(max(sketch.quantile(q) / 100, overall['min']), overall['max'])
+
+        return {
+            'total': round(overall['total'], 2),
+            'count': count,
+            'average': round(overall['total'] / count, 2),
+            'min': round(overall['min'], 2),
+            'max': round(overall['max'], 2),
+            'median': round(quantile(0.5), 2),
+            'p90': round(quantile(0.9), 2),
+            'p99': round(quantile(0.99), 2)
+        }
+
+    def _statistics(self, frame: ExpenseFrame) -> dict:
+        """Get exact statistical summary of the frame's amounts."""
+        if not frame.rows:
+            return self._empty_statistics()
+
+        # Amounts are integer cents, so the total is exact.
+        amounts_sorted = frame.sorted_cents()
+        total = frame.total_cents()
+        count = frame.rows
         average = total / count
 
-        # Calculate median
-        if count % 2 == 0:
-            median = (amounts_sorted[count // 2 - 1] + amounts_sorted[count // 2]) / 2
-        else:
-            median = amounts_sorted[count // 2]
+        def percentile(q: float) -> float:
+            # Linear interpolation between the closest ranks
+            position = q * (count - 1)
+            lower = int(position)
+            upper = min(lower + 1, count - 1)
+            return amounts_sorted[lower] + (amounts_sorted[upper] - amounts_sorted[lower]) * (position - lower)
 
         return {
-            'total': round(total, 2),
+            'total': round(total / 100, 2),
             'count': count,
-            'average': round(average, 2),
-            'min': round(min(amounts), 2),
-            'max': round(max(amounts), 2),
-            'median': round(median, 2)
+            'average': round(average / 100, 2),
+            'min': round(amounts_sorted[0] / 100, 2),
+            'max': round(amounts_sorted[-1] / 100, 2),
+            'median': round(percentile(0.5) / 100, 2),
+            'p90': round(percentile(0.9) / 100, 2),
+            'p99': round(percentile(0.99) / 100, 2)
         }
 
+    @_memoized
+    def get_amount_histogram(self, bins_per_decade: int = 1, exact: bool = False) -> List[dict]:
+        """Get expense counts in logarithmic amount bins.
+
+        Bins come from the quantile sketch, whose buckets may straddle a
+        bin edge by up to 1%; ``exact`` bins every amount instead.
+        """
+        if not exact:
+            return self.db.get_aggregate_cube().sketch.histogram(bins_per_decade, scale=100)
+        return log_histogram(((cents / 100, 1) for cents in self.db.get_expense_frame().sorted_cents()), bins_per_decade)
+
+    @_memoized
     def get_reimbursable_total(self) -> float:
         """Get total reimbursable expenses."""
-        expenses = self.db.get_expenses()
-        return sum(e['amount'] for e in expenses if e.get('is_reimbursable', False))
+        return self._reimbursable_total()
+
+    def _reimbursable_total(self) -> float:
+        """Get total reimbursable expenses from the aggregate cube."""
+        return self.db.get_aggregate_cube().reimbursable_cents / 100
 
+    @_memoized
     def get_daily_average(self) -> float:
         """Get average daily expense."""
-        expenses = self.db.get_expenses()
-        if not expenses:
-            return 0
-
-        # Calculate date range
-        dates = []
-        for expense in expenses:
-            from datetime import datetime
-            date = datetime.fromisoformat(expense['date']).date()
-            dates.append(date)
+        return self._daily_average()
 
-        if not dates:
+    def _daily_average(self) -> float:
+        """Get the average daily expense over the ledger's date span."""
+        span = self.db.get_date_span()
+        if span is None:
             return 0
 
-        date_range = (max(dates) - min(dates)).days + 1
-        total = sum(e['amount'] for e in expenses)
+        # Total over the whole span from the per-day prefix sums
+        date_range = (span[1] - span[0]).days + 1
+        total = self.db.get_range_total(
+            datetime.combine(span[0], datetime.min.time()), datetime.combine(span[1], datetime.max.time())
+        )
         return round(total / date_range if date_range > 0 else 0, 2)
 
+    @_memoized
+    def snapshot(self, top_limit: int = 10, exact: bool = False) -> AnalyticsSnapshot:
+        """Compute every dashboard metric into one immutable snapshot.
+
+        The snapshot is reused until the ledger changes, so ``generated_at``
+        is when it was first computed. It is built from the unmemoized
+        helpers, so one refresh counts as one cache lookup.
+        """
+        return AnalyticsSnapshot(
+            statistics=_freeze(self._expense_statistics(exact)),
+            daily_average=self._daily_average(),
+            reimbursable_total=self._reimbursable_total(),
+            category_distribution=_freeze(self._distribution('category')),
+            payment_method_distribution=_freeze(self._distribution('payment_method')),
+            top_expenses=_freeze(self.db.get_top_expenses(top_limit)),
+        )
+
     def get_forecast(self, days_ahead: int = 30) -> dict:
         """Simple forecast based on daily average."""
         daily_avg = self.get_daily_average()
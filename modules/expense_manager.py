@@ -4,9 +4,11 @@ Expense management module.
 
 import uuid
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Iterable, List, Optional
 from data.models import Expense, ExpenseReport, ExpenseCategory, PaymentMethod
 from data.database import DatabaseManager
+from data.cube import month_bounds, shift_month
+from data.query import ExpenseQuery
 
 
 class ExpenseManager:
@@ -42,6 +44,38 @@ class ExpenseManager:
         self.db.save_expense(expense)
         return expense
 
+    def create_expenses(self, rows: Iterable[dict]) -> dict:
+        """Create many expenses and save them in one batch.
+
+        Each row holds the keyword arguments accepted by ``create_expense``;
+        category and payment method may be enum members or their values.
+        Rows that cannot be turned into an expense are reported as failed.
+        """
+        expenses = []
+        failures = []
+        for index, row in enumerate(rows):
+            try:
+                expenses.append(Expense(
+                    id=str(uuid.uuid4()),
+                    description=row['description'],
+                    amount=row['amount'],
+                    category=ExpenseCategory(row['category']),
+                    payment_method=PaymentMethod(row['payment_method']),
+                    date=row.get('date') or datetime.now(),
+                    notes=row.get('notes'),
+                    receipt_path=row.get('receipt_path'),
+                    is_reimbursable=row.get('is_reimbursable', False)
+                ))
+            except (KeyError, ValueError) as e:
+                failures.append({'row': index, 'id': None, 'status': 'failed', 'error': str(e)})
+
+        summary = self.db.save_expenses(expenses)
+        if failures:
+            summary['results'].extend(failures)
+            summary['failed'] = summary.get('failed', 0) + len(failures)
+        summary['expenses'] = expenses
+        return summary
+
     def get_all_expenses(self) -> List[dict]:
         """Get all expenses."""
         return self.db.get_expenses()
@@ -79,6 +113,23 @@ class ExpenseManager:
         """Get expenses within date range."""
         return self.db.get_expenses_by_date_range(start_date, end_date)
 
+    def get_total_by_date_range(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        category: Optional[ExpenseCategory] = None
+    ) -> float:
+        """Get the total of expenses within date range, optionally for one category."""
+        return self.db.get_range_total(start_date, end_date, category)
+
+    def get_expenses_by_amount(
+        self,
+        descending: bool = True,
+        category: Optional[ExpenseCategory] = None
+    ) -> List[dict]:
+        """Get expenses ordered by amount, optionally within one category."""
+        return list(self.db.iter_expenses_by_amount(descending, category))
+
     def get_expenses_by_month(self, year: int, month: int) -> List[dict]:
         """Get expenses for specific month."""
         start_date = datetime(year, month, 1)
@@ -90,54 +141,39 @@ class ExpenseManager:
 
     def get_total_expenses(self, expenses: Optional[List[dict]] = None) -> float:
         """Get total of expenses."""
-        expenses = expenses or self.get_all_expenses()
+        expenses = expenses or self.db.iter_expenses()
         return sum(e['amount'] for e in expenses)
 
     def get_category_breakdown(self) -> dict:
         """Get expense breakdown by category."""
-        expenses = self.get_all_expenses()
-        breakdown = {}
-        for expense in expenses:
-            category = expense['category']
-            if category not in breakdown:
-                breakdown[category] = {'count': 0, 'total': 0}
-            breakdown[category]['count'] += 1
-            breakdown[category]['total'] += expense['amount']
-        return breakdown
+        totals = self.db.get_aggregate_cube().totals(('category',))
+        return {k: {'count': v['count'], 'total': v['total']} for k, v in totals.items()}
 
     def get_payment_method_breakdown(self) -> dict:
         """Get expense breakdown by payment method."""
-        expenses = self.get_all_expenses()
-        breakdown = {}
-        for expense in expenses:
-            method = expense['payment_method']
-            if method not in breakdown:
-                breakdown[method] = {'count': 0, 'total': 0}
-            breakdown[method]['count'] += 1
-            breakdown[method]['total'] += expense['amount']
-        return breakdown
+        totals = self.db.get_aggregate_cube().totals(('payment_method',))
+        return {k: {'count': v['count'], 'total': v['total']} for k, v in totals.items()}
 
     def search_expenses(self, query: str) -> List[dict]:
-        """Search expenses by description."""
-        expenses = self.get_all_expenses()
-        query_lower = query.lower()
-        return [e for e in expenses if query_lower in e['description'].lower()]
+        """Search expenses whose description contains ``query``, ignoring case.
+
+        Selective substrings read their candidates from the trigram index
+        and check them for the exact substring; common ones are cheaper to
+        scan, and the query planner picks whichever costs less.
+        """
+        return self.query_expenses(ExpenseQuery(text=query))
+
+    def search_text(self, text: str, limit: Optional[int] = None) -> List[dict]:
+        """Search descriptions and notes by words or word prefixes, most relevant first."""
+        return self.db.search_text(text, limit)
+
+    def query_expenses(self, query: ExpenseQuery) -> List[dict]:
+        """Get expenses matching a combined query, sorted and paged."""
+        return list(self.db.query_expenses(query))
 
     def _dict_to_expense(self, data: dict) -> Expense:
         """Convert dictionary to Expense object."""
-        return Expense(
-            id=data['id'],
-            description=data['description'],
-            amount=data['amount'],
-            category=ExpenseCategory(data['category']),
-            payment_method=PaymentMethod(data['payment_method']),
-            date=datetime.fromisoformat(data['date']),
-            notes=data.get('notes'),
-            receipt_path=data.get('receipt_path'),
-            is_reimbursable=data.get('is_reimbursable', False),
-            created_at=datetime.fromisoformat(data.get('created_at', datetime.now().isoformat())),
-            updated_at=datetime.fromisoformat(data.get('updated_at', datetime.now().isoformat()))
-        )
+        return Expense.from_dict(data)
 
 
 class ReportGenerator:
@@ -155,23 +191,52 @@ class ReportGenerator:
         notes: Optional[str] = None
     ) -> ExpenseReport:
         """Create a new expense report."""
+        # Get expenses for date range
+        expenses_data = self.db.get_expenses_by_date_range(start_date, end_date)
         report = ExpenseReport(
             report_id=str(uuid.uuid4()),
             title=title,
             start_date=start_date,
             end_date=end_date,
+            expenses=[self._dict_to_expense(exp_data) for exp_data in expenses_data],
             notes=notes
         )
 
-        # Get expenses for date range
-        expenses_data = self.db.get_expenses_by_date_range(start_date, end_date)
-        for exp_data in expenses_data:
-            expense = self._dict_to_expense(exp_data)
-            report.add_expense(expense)
-
         self.db.save_report(report)
         return report
 
+    def open_report(self, report_id: str) -> Optional[ExpenseReport]:
+        """Load a saved report together with its expenses."""
+        return self.db.get_report(report_id)
+
+    def get_category_totals(self, start_date: datetime, end_date: datetime) -> dict:
+        """Get total amount per category for a period without loading a report.
+
+        Whole months inside the period come from the aggregate cube; only
+        the partial months at either end are read expense by expense.
+        """
+        first_month = f"{start_date:%Y-%m}"
+        if month_bounds(first_month)[0] < start_date:
+            first_month = shift_month(first_month, 1)
+        last_month = f"{end_date:%Y-%m}"
+        if month_bounds(last_month)[1] > end_date:
+            last_month = shift_month(last_month, -1)
+
+        cents = {}
+        edges = [(start_date, end_date)]
+        if first_month <= last_month:
+            for category, data in self.db.get_aggregate_cube().totals(('category',), first_month, last_month).items():
+                cents[category] = round(data['total'] * 100)
+            edges = [
+                (start_date, month_bounds(first_month)[0] - timedelta(microseconds=1)),
+                (month_bounds(last_month)[1] + timedelta(microseconds=1), end_date),
+            ]
+        for lo, hi in edges:
+            if lo <= hi:
+                for expense in self.db.iter_expenses_by_date_range(lo, hi):
+                    cents[expense['category']] = cents.get(expense['category'], 0) + round(expense['amount'] * 100)
+        return {category: total / 100 for category, total in cents.items()}
+
     def get_report_summary(self, report: ExpenseReport) -> dict:
         """Get summary of a report."""
         return {
@@ -185,16 +250,4 @@ class ReportGenerator:
 
     def _dict_to_expense(self, data: dict) -> Expense:
         """Convert dictionary to Expense object."""
-        return Expense(
-            id=data['id'],
-            description=data['description'],
-            amount=data['amount'],
-            category=ExpenseCategory(data['category']),
-            payment_method=PaymentMethod(data['payment_method']),
-            date=datetime.fromisoformat(data['date']),
-            notes=data.get('notes'),
-            receipt_path=data.get('receipt_path'),
-            is_reimbursable=data.get('is_reimbursable', False),
-            created_at=datetime.fromisoformat(data.get('created_at', datetime.now().isoformat())),
-            updated_at=datetime.fromisoformat(data.get('updated_at', datetime.now().isoformat()))
-        )
+        return Expense.from_dict(data)
@@ -0,0 +1,36 @@
+"""
+Tests for DatabaseManager's derived data across writes.
+"""
+
+from datetime import datetime
+
+from data.database import DatabaseManager
+from data.models import Expense, ExpenseCategory, PaymentMethod
+
+
+def _expense(expense_id: str, amount: float) -> Expense:
+    """Build a minimal expense."""
+    return Expense(
+        expense_id, f"Expense {expense_id}", amount,
+        ExpenseCategory.TRAVEL, PaymentMethod.CASH, datetime(2024, 1, 1)
+    )
+
+
+def test_backend_flush_keeps_cube_and_indexes(tmp_path):
+    """A group-commit flush by the backend does not force a cube rebuild."""
+    db = DatabaseManager(str(tmp_path), commit_delay=60)
+    db.save_expense(_expense('a', 10))
+    db.backend.flush()
+    cube = db.get_aggregate_cube()
+    db.get_top_expenses(1)
+    indexes = dict(db._indexes)
+
+    db.save_expense(_expense('b', 20))
+    assert db.backend.signature() is None
+    # What the commit timer does when its window closes
+    db.backend.flush()
+
+    assert db.get_aggregate_cube() is cube
+    assert db._indexes == indexes
+    assert [e['id'] for e in db.get_top_expenses(2)] == ['b', 'a']
+    db.close()
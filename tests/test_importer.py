@@ -0,0 +1,117 @@
+"""
+Tests for bulk importing bank statements.
+"""
+
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from data.database import DatabaseManager
+from data.models import ExpenseCategory
+from modules.importer import IMPORT_NAMESPACE, ExpenseImporter, parse_amount, parse_date
+
+
+OFX = """OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20240305120000
+<TRNAMT>-42.10
+<FITID>T1
+<NAME>Grocery Mart
+</STMTTRN>
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20240306
+<TRNAMT>1500.00
+<FITID>T2
+<NAME>Salary
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+def _write(tmp_path, name: str, text: str) -> str:
+    """Write an import file and get its path."""
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_parse_amount_and_date():
+    """Currency symbols, thousands separators, parentheses and OFX timestamps are understood."""
+    assert parse_amount('-1,234.50') == Decimal('-1234.50')
+    assert parse_amount('$12.00') == Decimal('12.00')
+    assert parse_amount('(9.99)') == Decimal('-9.99')
+    with pytest.raises(ValueError):
+        parse_amount('n/a')
+    assert parse_date('2024-03-05') == datetime(2024, 3, 5)
+    assert parse_date('20240305120000') == datetime(2024, 3, 5, 12)
+    assert parse_date('05.03.2024') == datetime(2024, 3, 5)
+
+
+def test_csv_import_skips_credits_and_rejects_bad_rows(tmp_path):
+    """Bank CSV payments are imported as positive amounts; deposits are skipped, bad rows reported."""
+    db = DatabaseManager(str(tmp_path / "db"))
+    path = _write(tmp_path, "bank.csv", (
+        "Date,Description,Amount,Category\n"
+        "2024-03-05,Taxi to airport,-35.00,travel\n"
+        "03/06/2024,Refund,20.00,\n"
+        "2024-03-07,Broken row,abc,\n"
+    ))
+    summary = ExpenseImporter(db).import_file(path)
+
+    assert summary['sign_convention'] == 'debit_negative'
+    assert (summary['imported'], summary['skipped'], summary['invalid']) == (1, 1, 1)
+    assert summary['errors'][0]['row'] == 3
+    [expense] = db.get_expenses()
+    assert expense['amount'] == 35.0
+    assert expense['category'] == ExpenseCategory.TRAVEL.value
+
+
+def test_reimport_is_deduplicated(tmp_path):
+    """Importing the same file twice adds nothing; identical rows in one file are both kept."""
+    db = DatabaseManager(str(tmp_path / "db"))
+    path = _write(tmp_path, "bank.csv", (
+        "Date,Description,Amount\n"
+        "2024-03-05,Coffee,-3.50\n"
+        "2024-03-05,Coffee,-3.50\n"
+    ))
+    importer = ExpenseImporter(db)
+    assert importer.import_file(path)['imported'] == 2
+    second = importer.import_file(path)
+
+    assert (second['imported'], second['duplicates']) == (0, 2)
+    assert len(db.get_expenses()) == 2
+
+
+def test_ofx_import_uses_fitid_and_debits(tmp_path):
+    """OFX transactions are parsed from their blocks, keyed by FITID, and only debits are imported."""
+    db = DatabaseManager(str(tmp_path / "db"))
+    summary = ExpenseImporter(db).import_file(_write(tmp_path, "statement.ofx", OFX))
+
+    assert (summary['parsed'], summary['imported'], summary['skipped']) == (2, 1, 1)
+    [expense] = db.get_expenses()
+    assert expense['id'] == str(uuid.uuid5(IMPORT_NAMESPACE, 'T1#1'))
+    assert expense['description'] == 'Grocery Mart'
+    assert expense['amount'] == 42.10
+    assert expense['date'].startswith('2024-03-05')
+
+
+def test_jsonl_sign_convention_follows_format_or_choice(tmp_path):
+    """JSON Lines defaults to positive expenses; an explicit convention overrides it."""
+    path = _write(tmp_path, "expenses.jsonl", (
+        '{"date": "2024-03-05", "description": "Lunch", "amount": 12.5}\n'
+        '\n'
+        '{"date": "2024-03-06", "description": "Returned item", "amount": -8}\n'
+    ))
+    summary = ExpenseImporter(DatabaseManager(str(tmp_path / "a"))).import_file(path)
+    assert (summary['sign_convention'], summary['imported'], summary['skipped']) == ('expense_positive', 1, 1)
+
+    summary = ExpenseImporter(DatabaseManager(str(tmp_path / "b")), sign_convention='absolute').import_file(path)
+    assert (summary['imported'], summary['skipped']) == (2, 0)
+
+    with pytest.raises(ValueError):
+        ExpenseImporter(DatabaseManager(str(tmp_path / "c")), sign_convention='both')
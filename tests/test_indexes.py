@@ -0,0 +1,38 @@
+"""
+Tests for the in-memory expense indexes.
+"""
+
+from datetime import datetime
+
+from data.indexes import DateIndex, LedgerOrder
+
+
+def test_date_index_remove_after_build():
+    """Records indexed at construction can be removed and range reads still work."""
+    index = DateIndex([
+        {'id': 'a', 'date': '2024-01-05T10:00:00'},
+        {'id': 'b', 'date': '2024-01-10T10:00:00'},
+        {'id': 'c', 'date': '2024-02-01T10:00:00'},
+    ])
+    index.remove('b')
+    assert len(index) == 2
+    assert index.ids_between(datetime(2024, 1, 1), datetime(2024, 12, 31)) == ['a', 'c']
+    assert index.count_between(datetime(2024, 1, 1), datetime(2024, 1, 31)) == 1
+
+
+def test_date_index_update_after_build_replaces_entry():
+    """Re-adding a record indexed at construction moves it instead of duplicating it."""
+    index = DateIndex([{'id': 'a', 'date': '2024-01-05T10:00:00'}])
+    index.add({'id': 'a', 'date': '2024-03-01T10:00:00'})
+    assert len(index) == 1
+    assert index.ids_between(datetime(2024, 1, 1), datetime(2024, 1, 31)) == []
+    assert index.ids_between(datetime(2024, 3, 1), datetime(2024, 3, 31)) == ['a']
+
+
+def test_ledger_order_keeps_position_on_update():
+    """Updated records keep their position; new ones go last."""
+    order = LedgerOrder([{'id': 'a'}, {'id': 'b'}, {'id': 'c'}])
+    order.add({'id': 'a'})
+    order.add({'id': 'd'})
+    order.remove('b')
+    assert order.sort(['d', 'c', 'a']) == ['a', 'c', 'd']
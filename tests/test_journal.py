@@ -0,0 +1,52 @@
+"""
+Tests for the append-only journal backend.
+"""
+
+import json
+
+from data.backends.journal import JournalBackend
+
+
+def _record(expense_id: str, amount: float = 10.0, day: int = 1) -> dict:
+    """Build a minimal expense record."""
+    return {'id': expense_id, 'description': expense_id, 'amount': amount, 'date': f'2024-01-{day:02d}T00:00:00'}
+
+
+def test_reopen_replays_journal(tmp_path):
+    """Puts and deletes since the snapshot are replayed by a new instance."""
+    backend = JournalBackend(tmp_path)
+    backend.put_expenses([_record('a'), _record('b')])
+    backend.put_expense(_record('a', amount=25.0))
+    backend.delete_expense('b')
+
+    reopened = JournalBackend(tmp_path)
+    assert reopened.load_expenses() == [_record('a', amount=25.0)]
+    assert json.loads((tmp_path / "expenses.json").read_text()) == []
+
+
+def test_truncated_last_line_is_ignored_and_overwritten(tmp_path):
+    """A torn append is skipped on replay and replaced by the next write."""
+    backend = JournalBackend(tmp_path)
+    backend.put_expense(_record('a'))
+    with open(tmp_path / "expenses.journal", 'ab') as f:
+        f.write(b'{"op":"put","record":{"id":"torn"')
+
+    reopened = JournalBackend(tmp_path)
+    assert [e['id'] for e in reopened.load_expenses()] == ['a']
+    reopened.put_expense(_record('b'))
+
+    lines = (tmp_path / "expenses.journal").read_bytes().splitlines()
+    assert [json.loads(line)['record']['id'] for line in lines] == ['a', 'b']
+    assert sorted(e['id'] for e in JournalBackend(tmp_path).load_expenses()) == ['a', 'b']
+
+
+def test_compaction_folds_journal_into_snapshot(tmp_path):
+    """Once the journal outgrows the threshold it is written into the snapshot and emptied."""
+    backend = JournalBackend(tmp_path, compact_threshold=3)
+    backend.put_expenses([_record('a'), _record('b')])
+    assert (tmp_path / "expenses.journal").stat().st_size > 0
+    backend.delete_expense('a')
+
+    assert (tmp_path / "expenses.journal").stat().st_size == 0
+    assert [e['id'] for e in json.loads((tmp_path / "expenses.json").read_text())] == ['b']
+    assert [e['id'] for e in JournalBackend(tmp_path).load_expenses()] == ['b']
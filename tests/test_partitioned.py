@@ -0,0 +1,58 @@
+"""
+Tests for the month-partitioned backend.
+"""
+
+import json
+from datetime import datetime
+
+from data.backends.partitioned import PartitionedBackend
+
+
+def _record(expense_id: str, date: str, amount: float = 10.0) -> dict:
+    """Build a minimal expense record."""
+    return {'id': expense_id, 'description': expense_id, 'amount': amount, 'date': date}
+
+
+def _locator_lines(tmp_path) -> list:
+    """Read the locator log as ``[id, month]`` pairs."""
+    return [json.loads(line) for line in (tmp_path / "partitions" / "locator.log").read_bytes().splitlines()]
+
+
+def test_moving_an_expense_between_months(tmp_path):
+    """Changing the date moves the record and drops the emptied partition."""
+    backend = PartitionedBackend(tmp_path)
+    backend.put_expense(_record('a', '2024-01-15T00:00:00'))
+    backend.put_expense(_record('a', '2024-02-03T00:00:00', amount=30.0))
+
+    partitions = tmp_path / "partitions"
+    assert not (partitions / "2024-01.json").exists()
+    assert [e['id'] for e in json.loads((partitions / "2024-02.json").read_text())] == ['a']
+    manifest = json.loads((partitions / "manifest.json").read_text())
+    assert manifest['partitions'] == {'2024-02': {'count': 1}}
+    assert backend.find_expense('a')['amount'] == 30.0
+    assert backend.find_by_date_range(datetime(2024, 1, 1), datetime(2024, 1, 31)) == []
+
+
+def test_locator_log_is_replayed_on_open(tmp_path):
+    """A new instance finds moved and deleted expenses from the locator log alone."""
+    backend = PartitionedBackend(tmp_path)
+    backend.put_expenses([_record('a', '2024-01-15T00:00:00'), _record('b', '2024-01-20T00:00:00')])
+    backend.put_expense(_record('a', '2024-03-01T00:00:00'))
+    backend.delete_expense('b')
+    assert _locator_lines(tmp_path) == [['a', '2024-01'], ['b', '2024-01'], ['a', '2024-03'], ['b', None]]
+
+    reopened = PartitionedBackend(tmp_path)
+    assert reopened.find_expense('a')['date'] == '2024-03-01T00:00:00'
+    assert reopened.find_expense('b') is None
+    assert reopened.delete_expenses(['b']) == []
+
+
+def test_locator_log_is_compacted(tmp_path):
+    """Past the threshold the log is rewritten to one line per live expense."""
+    backend = PartitionedBackend(tmp_path, compact_threshold=4)
+    backend.put_expenses([_record('a', '2024-01-15T00:00:00'), _record('b', '2024-01-20T00:00:00')])
+    backend.put_expense(_record('a', '2024-02-01T00:00:00'))
+    backend.delete_expense('b')
+
+    assert _locator_lines(tmp_path) == [['a', '2024-02']]
+    assert PartitionedBackend(tmp_path).find_expense('a')['date'] == '2024-02-01T00:00:00'
@@ -7,7 +7,7 @@ from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                                QTableWidgetItem, QMessageBox)
 from PySide6.QtCore import Qt, QDate
 from datetime import datetime
-from data.database import DatabaseManager
+from data.database import DatabaseManager, UI_COMMIT_DELAY
 from modules.analytics import ExpenseAnalytics
 from ui.widgets import StatisticCard
 
@@ -18,7 +18,7 @@ class AnalyticsTab(QWidget):
     def __init__(self, parent=None):
         """Initialize analytics tab."""
         super().__init__(parent)
-        self.db_manager = DatabaseManager()
+        self.db_manager = DatabaseManager.shared(commit_delay=UI_COMMIT_DELAY)
         self.analytics = ExpenseAnalytics(self.db_manager)
         self.init_ui()
         self.load_analytics()
@@ -34,7 +34,7 @@ class AnalyticsTab(QWidget):
         self.total_stat = StatisticCard("Total Expenses", "$0.00", "All time")
         self.avg_stat = StatisticCard("Average Expense", "$0.00", "Per transaction")
         self.max_stat = StatisticCard("Maximum Expense", "$0.00", "Single transaction")
-        self.median_stat = StatisticCard("Median Expense", "$0.00", "Middle value")
+        self.median_stat = StatisticCard("Median Expense", "$0.00", "Middle value (approx.)")
         stats_layout.addWidget(self.total_stat)
         stats_layout.addWidget(self.avg_stat)
         stats_layout.addWidget(self.max_stat)
@@ -93,81 +93,48 @@ class AnalyticsTab(QWidget):
 
     def load_analytics(self) -> None:
         """Load and display analytics."""
-        stats = self.analytics.get_expense_statistics()
-        
-        # Update statistics
-        for i, label in enumerate(self.total_stat.findChildren(QLabel)):
-            if i == 1:
-                label.setText(f"${stats['total']:.2f}")
-
-        for i, label in enumerate(self.avg_stat.findChildren(QLabel)):
-            if i == 1:
-                label.setText(f"${stats['average']:.2f}")
-
-        for i, label in enumerate(self.max_stat.findChildren(QLabel)):
-            if i == 1:
-                label.setText(f"${stats['max']:.2f}")
-
-        for i, label in enumerate(self.median_stat.findChildren(QLabel)):
-            if i == 1:
-                label.setText(f"${stats['median']:.2f}")
-
-        for i, label in enumerate(self.min_stat.findChildren(QLabel)):
-            if i == 1:
-                label.setText(f"${stats['min']:.2f}")
-
-        for i, label in enumerate(self.count_stat.findChildren(QLabel)):
-            if i == 1:
-                label.setText(str(stats['count']))
+        snapshot = self.analytics.snapshot(10)
+        stats = snapshot.statistics
 
-        daily_avg = self.analytics.get_daily_average()
-        for i, label in enumerate(self.daily_stat.findChildren(QLabel)):
-            if i == 1:
-                label.setText(f"${daily_avg:.2f}")
-
-        reimbursable = self.analytics.get_reimbursable_total()
-        for i, label in enumerate(self.reimbursable_stat.findChildren(QLabel)):
-            if i == 1:
-                label.setText(f"${reimbursable:.2f}")
+        # Update statistics
+        cards = (
+            (self.total_stat, f"${stats['total']:.2f}"),
+            (self.avg_stat, f"${stats['average']:.2f}"),
+            (self.max_stat, f"${stats['max']:.2f}"),
+            (self.median_stat, f"~${stats['median']:.2f}"),
+            (self.min_stat, f"${stats['min']:.2f}"),
+            (self.count_stat, str(stats['count'])),
+            (self.daily_stat, f"${snapshot.daily_average:.2f}"),
+            (self.reimbursable_stat, f"${snapshot.reimbursable_total:.2f}"),
+        )
+        for card, text in cards:
+            for i, label in enumerate(card.findChildren(QLabel)):
+                if i == 1:
+                    label.setText(text)
 
         # Load category breakdown
-        self._load_category_breakdown()
+        self._load_distribution(self.category_table, snapshot.category_distribution)
 
         # Load payment method breakdown
-        self._load_method_breakdown()
+        self._load_distribution(self.method_table, snapshot.payment_method_distribution)
 
         # Load top expenses
-        self._load_top_expenses()
-
-    def _load_category_breakdown(self) -> None:
-        """Load category breakdown table."""
-        distribution = self.analytics.get_category_distribution()
-        self.category_table.setRowCount(0)
-
-        for category, data in distribution.items():
-            row = self.category_table.rowCount()
-            self.category_table.insertRow(row)
-            self.category_table.setItem(row, 0, QTableWidgetItem(category))
-            self.category_table.setItem(row, 1, QTableWidgetItem(str(data['count'])))
-            self.category_table.setItem(row, 2, QTableWidgetItem(f"${data['amount']:.2f}"))
-            self.category_table.setItem(row, 3, QTableWidgetItem(f"{data['percentage']:.1f}%"))
-
-    def _load_method_breakdown(self) -> None:
-        """Load payment method breakdown table."""
-        distribution = self.analytics.get_payment_method_distribution()
-        self.method_table.setRowCount(0)
-
-        for method, data in distribution.items():
-            row = self.method_table.rowCount()
-            self.method_table.insertRow(row)
-            self.method_table.setItem(row, 0, QTableWidgetItem(method))
-            self.method_table.setItem(row, 1, QTableWidgetItem(str(data['count'])))
-            self.method_table.setItem(row, 2, QTableWidgetItem(f"${data['amount']:.2f}"))
-            self.method_table.setItem(row, 3, QTableWidgetItem(f"{data['percentage']:.1f}%"))
-
-    def _load_top_expenses(self) -> None:
+        self._load_top_expenses(snapshot.top_expenses)
+
+    def _load_distribution(self, table: QTableWidget, distribution: dict) -> None:
+        """Load a category or payment method breakdown table."""
+        table.setRowCount(0)
+
+        for label, data in distribution.items():
+            row = table.rowCount()
+            table.insertRow(row)
+            table.setItem(row, 0, QTableWidgetItem(label))
+            table.setItem(row, 1, QTableWidgetItem(str(data['count'])))
+            table.setItem(row, 2, QTableWidgetItem(f"${data['amount']:.2f}"))
+            table.setItem(row, 3, QTableWidgetItem(f"{data['percentage']:.1f}%"))
+
+    def _load_top_expenses(self, top_expenses) -> None:
         """Load top expenses table."""
-        top_expenses = self.analytics.get_top_expenses(10)
         self.top_table.setRowCount(0)
 
         for expense in top_expenses:
@@ -193,7 +160,9 @@ class AnalyticsTab(QWidget):
 
     def _save_report_to_file(self, file_path: str) -> None:
         """Save report to file."""
-        stats = self.analytics.get_expense_statistics()
+        # The report is kept as a record, so its quantiles are exact
+        snapshot = self.analytics.snapshot(exact=True)
+        stats = snapshot.statistics
         with open(file_path, 'w') as f:
             f.write("=" * 60 + "\n")
             f.write("EXPENSE ANALYTICS REPORT\n")
@@ -210,8 +179,7 @@ class AnalyticsTab(QWidget):
 
             f.write("CATEGORY BREAKDOWN\n")
             f.write("-" * 60 + "\n")
-            distribution = self.analytics.get_category_distribution()
-            for category, data in distribution.items():
+            for category, data in snapshot.category_distribution.items():
                 f.write(f"{category}: ${data['amount']:.2f} ({data['percentage']:.1f}%) - {data['count']} transactions\n")
 
             f.write("\n" + "=" * 60 + "\n")
@@ -4,13 +4,29 @@ Expense management tab for the application.
 
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                                QPushButton, QLineEdit, QComboBox, QDateEdit,
-                               QMessageBox, QDialog, QScrollArea)
-from PySide6.QtCore import Qt, QDate, QDateTime, Signal
+                               QMessageBox, QDialog, QScrollArea, QProgressDialog)
+from PySide6.QtCore import Qt, QDate, QDateTime, Signal, QThread, QTimer
 from datetime import datetime
-from data.database import DatabaseManager
+from pathlib import Path
+from typing import List, Optional
+from data.database import DatabaseManager, UI_COMMIT_DELAY
 from data.models import ExpenseCategory, PaymentMethod
+from data.query import ExpenseQuery
 from modules.expense_manager import ExpenseManager
 from ui.widgets import ExpenseTable, ExpenseForm, StatisticCard
+from modules.importer import ExpenseImporter, FILE_FORMATS, FORMAT_SIGN_CONVENTIONS
+from ui.workers import CsvExportWorker, ImportWorker
+
+# Rows shown for a search, and how long typing must pause before it runs
+SEARCH_LIMIT = 200
+SEARCH_DELAY_MS = 150
+
+# Import choices for reading amount signs, keyed by importer sign convention
+SIGN_CHOICES = {
+    'debit_negative': "Bank statement: payments are negative",
+    'expense_positive': "Expense list: expenses are positive",
+    'absolute': "Import every row as an expense",
+}
 
 
 class ExpenseTab(QWidget):
@@ -19,8 +35,11 @@ class ExpenseTab(QWidget):
     def __init__(self, parent=None):
         """Initialize expense tab."""
         super().__init__(parent)
-        self.db_manager = DatabaseManager()
+        self.db_manager = DatabaseManager.shared(commit_delay=UI_COMMIT_DELAY)
         self.expense_manager = ExpenseManager(self.db_manager)
+        self.export_thread = None
+        self.import_thread = None
+        self.amount_descending = True
         self.init_ui()
         self.load_expenses()
 
@@ -46,9 +65,13 @@ class ExpenseTab(QWidget):
         # Search
         search_label = QLabel("Search:")
         self.search_input = QLineEdit()
-        self.search_input.setPlaceholderText("Search by description...")
+        self.search_input.setPlaceholderText("Search descriptions and notes...")
         self.search_input.setMaximumWidth(250)
-        self.search_input.textChanged.connect(self._on_search)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self._on_search)
+        self.search_input.textChanged.connect(self.search_timer.start)
         toolbar_layout.addWidget(search_label)
         toolbar_layout.addWidget(self.search_input)
 
@@ -84,6 +107,12 @@ class ExpenseTab(QWidget):
         self.delete_btn.setEnabled(False)
         toolbar_layout.addWidget(self.delete_btn)
 
+        # Import Button
+        import_btn = QPushButton("⬆ Import")
+        import_btn.setObjectName("importButton")
+        import_btn.clicked.connect(self._on_import)
+        toolbar_layout.addWidget(import_btn)
+
         # Export Button
         export_btn = QPushButton("⬇ Export CSV")
         export_btn.setObjectName("exportButton")
@@ -95,6 +124,7 @@ class ExpenseTab(QWidget):
         # Expense table
         self.expense_table = ExpenseTable()
         self.expense_table.itemSelectionChanged.connect(self._on_table_selection_changed)
+        self.expense_table.horizontalHeader().sectionClicked.connect(self._on_header_clicked)
         main_layout.addWidget(self.expense_table)
 
     def load_expenses(self) -> None:
@@ -189,48 +219,205 @@ class ExpenseTab(QWidget):
             else:
                 QMessageBox.critical(self, "Error", "Failed to delete expense.")
 
-    def _on_search(self) -> None:
-        """Search expenses."""
-        query = self.search_input.text()
-        if not query:
-            self.load_expenses()
-            return
+    def _current_queries(self) -> List[ExpenseQuery]:
+        """Build the queries for the search text and category filter.
 
-        results = self.expense_manager.search_expenses(query)
+        Search text runs as a relevance-ranked word query and then as a
+        substring of the description, so text inside words still matches.
+        Searches are paged to ``SEARCH_LIMIT`` rows.
+        """
+        category_text = self.category_filter.currentText()
+        category = None if category_text == "All Categories" else ExpenseCategory(category_text)
+        query = ExpenseQuery(category=category)
+        search = self.search_input.text().strip()
+        if not search:
+            return [query]
+        substring = query.where(text=search).page(SEARCH_LIMIT)
+        words = query.where(terms=search)
+        if not words.words():
+            return [substring]
+        return [words.order_by('relevance').page(SEARCH_LIMIT), substring]
+
+    def _show_queries(self, queries: List[ExpenseQuery], amount_order: Optional[bool] = None) -> None:
+        """Fill the table with the rows of each query in turn, skipping repeats.
+
+        With ``amount_order`` set, each query is sorted by amount that way
+        and the combined rows are sorted again before paging.
+        """
+        rows = {}
+        limit = queries[0].limit
+        for query in queries:
+            if amount_order is not None:
+                query = query.order_by('amount', amount_order)
+            elif limit is not None and len(rows) >= limit:
+                break
+            for expense in self.expense_manager.query_expenses(query):
+                rows.setdefault(expense['id'], expense)
+        expenses = list(rows.values())
+        if amount_order is not None and len(queries) > 1:
+            expenses.sort(key=lambda e: e['amount'], reverse=amount_order)
         self.expense_table.clear_table()
-        for expense in results:
+        for expense in expenses[:limit]:
             self.expense_table.add_row(expense)
 
+    def _on_search(self) -> None:
+        """Search expenses within the selected category."""
+        self._show_queries(self._current_queries())
+
     def _on_filter_category(self) -> None:
-        """Filter expenses by category."""
-        category_text = self.category_filter.currentText()
-        if category_text == "All Categories":
-            self.load_expenses()
-            return
+        """Filter expenses by category, keeping the search text."""
+        self.search_timer.stop()
+        self._show_queries(self._current_queries())
 
-        try:
-            category = ExpenseCategory(category_text)
-            expenses = self.expense_manager.get_expenses_by_category(category)
-            self.expense_table.clear_table()
-            for expense in expenses:
-                self.expense_table.add_row(expense)
-        except ValueError:
-            self.load_expenses()
+    def _on_header_clicked(self, section: int) -> None:
+        """Sort the filtered expenses by amount when the Amount header is clicked."""
+        if section != 1:
+            return
+        self.search_timer.stop()
+        self._show_queries(self._current_queries(), self.amount_descending)
+        header = self.expense_table.horizontalHeader()
+        header.setSortIndicatorShown(True)
+        header.setSortIndicator(1, Qt.DescendingOrder if self.amount_descending else Qt.AscendingOrder)
+        self.amount_descending = not self.amount_descending
 
     def _on_export(self) -> None:
-        """Export expenses to CSV."""
+        """Export expenses to CSV on a background thread."""
         from PySide6.QtWidgets import QFileDialog
+        if self.export_thread is not None:
+            QMessageBox.warning(self, "Warning", "An export is already running.")
+            return
+
         file_path, _ = QFileDialog.getSaveFileName(
             self,
             "Export Expenses",
             "",
             "CSV Files (*.csv)"
         )
-        if file_path:
-            if self.db_manager.export_expenses_csv(file_path):
-                QMessageBox.information(self, "Success", f"Expenses exported to {file_path}")
-            else:
-                QMessageBox.critical(self, "Error", "Failed to export expenses.")
+        if not file_path:
+            return
+
+        # Export what the category filter currently shows
+        category = None
+        if self.category_filter.currentText() != "All Categories":
+            category = ExpenseCategory(self.category_filter.currentText())
+
+        self.export_progress = QProgressDialog("Exporting expenses...", "Cancel", 0, 0, self)
+        self.export_progress.setWindowTitle("Export Expenses")
+        self.export_progress.setWindowModality(Qt.WindowModal)
+        self.export_progress.setMinimumDuration(500)
+
+        self.export_thread = QThread(self)
+        self.export_path = file_path
+        self.export_worker = CsvExportWorker(self.db_manager, file_path, category=category)
+        self.export_worker.moveToThread(self.export_thread)
+        self.export_thread.started.connect(self.export_worker.run)
+        self.export_worker.progress.connect(self._on_export_progress)
+        self.export_worker.finished.connect(self._on_export_finished)
+        self.export_worker.cancelled.connect(self._on_export_cancelled)
+        self.export_worker.failed.connect(self._on_export_failed)
+        # The worker's thread is busy in run(), so a queued call would only
+        # arrive once the export is over; cancel() just sets an Event.
+        self.export_progress.canceled.connect(self.export_worker.cancel, Qt.DirectConnection)
+        self.export_thread.start()
+
+    def _on_export_progress(self, count: int) -> None:
+        """Show how many rows have been exported so far."""
+        self.export_progress.setLabelText(f"Exporting expenses... {count} rows written")
+
+    def _on_export_finished(self, count: int) -> None:
+        """Report a completed export."""
+        self._on_export_done(
+            QMessageBox.information, "Success", f"Exported {count} expenses to {self.export_path}")
+
+    def _on_export_cancelled(self) -> None:
+        """Report a cancelled export."""
+        self._on_export_done(QMessageBox.information, "Cancelled", "Export cancelled.")
+
+    def _on_export_failed(self, error: str) -> None:
+        """Report a failed export."""
+        self._on_export_done(QMessageBox.critical, "Error", f"Failed to export expenses: {error}")
+
+    def _on_export_done(self, show_message, title: str, message: str) -> None:
+        """Tear down the export thread and report the result."""
+        self.export_progress.reset()
+        self.export_thread.quit()
+        self.export_thread.wait()
+        self.export_thread = None
+        self.export_worker.deleteLater()
+        show_message(self, title, message)
+
+    def _on_import(self) -> None:
+        """Import bank transactions on a background thread."""
+        from PySide6.QtWidgets import QFileDialog, QInputDialog
+        if self.import_thread is not None:
+            QMessageBox.warning(self, "Warning", "An import is already running.")
+            return
+
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Import Transactions",
+            "",
+            "Statements (*.csv *.ofx *.qfx *.jsonl *.ndjson)"
+        )
+        if not file_path:
+            return
+
+        # Offer the sign convention, defaulting to the one for the file's format
+        file_format = FILE_FORMATS.get(Path(file_path).suffix.lower())
+        conventions = list(SIGN_CHOICES)
+        default = conventions.index(FORMAT_SIGN_CONVENTIONS.get(file_format, 'debit_negative'))
+        choice, ok = QInputDialog.getItem(
+            self, "Import Transactions", "How are amounts signed in this file?",
+            list(SIGN_CHOICES.values()), default, False
+        )
+        if not ok:
+            return
+        sign_convention = conventions[list(SIGN_CHOICES.values()).index(choice)]
+
+        self.import_progress = QProgressDialog("Importing transactions...", None, 0, 0, self)
+        self.import_progress.setWindowTitle("Import Transactions")
+        self.import_progress.setWindowModality(Qt.WindowModal)
+        self.import_progress.setMinimumDuration(500)
+
+        self.import_thread = QThread(self)
+        self.import_worker = ImportWorker(
+            ExpenseImporter(self.db_manager, sign_convention=sign_convention), file_path
+        )
+        self.import_worker.moveToThread(self.import_thread)
+        self.import_thread.started.connect(self.import_worker.run)
+        self.import_worker.progress.connect(self._on_import_progress)
+        self.import_worker.finished.connect(self._on_import_finished)
+        self.import_worker.failed.connect(self._on_import_failed)
+        self.import_thread.start()
+
+    def _on_import_progress(self, count: int) -> None:
+        """Show how many rows have been read so far."""
+        self.import_progress.setLabelText(f"Importing transactions... {count} rows read")
+
+    def _on_import_finished(self, summary: dict) -> None:
+        """Reload the table and summarize the import."""
+        self.load_expenses()
+        self._on_import_done(
+            QMessageBox.information, "Import Complete",
+            f"Imported {summary['imported']} expenses.\n"
+            f"Duplicates skipped: {summary['duplicates']}\n"
+            f"Skipped for their sign: {summary['skipped']} "
+            f"({SIGN_CHOICES[summary['sign_convention']].lower()})\n"
+            f"Invalid rows: {summary['invalid']}"
+        )
+
+    def _on_import_failed(self, error: str) -> None:
+        """Report a failed import."""
+        self._on_import_done(QMessageBox.critical, "Error", f"Failed to import transactions: {error}")
+
+    def _on_import_done(self, show_message, title: str, message: str) -> None:
+        """Tear down the import thread and report the result."""
+        self.import_progress.reset()
+        self.import_thread.quit()
+        self.import_thread.wait()
+        self.import_thread = None
+        self.import_worker.deleteLater()
+        show_message(self, title, message)
 
     def _on_table_selection_changed(self) -> None:
         """Handle table selection change."""
@@ -74,6 +74,11 @@ class MainWindow(QMainWindow):
         about_action = help_menu.addAction("About")
         about_action.triggered.connect(self.show_about)
 
+    def closeEvent(self, event) -> None:
+        """Write out grouped changes before the window closes."""
+        self.expense_tab.db_manager.flush()
+        super().closeEvent(event)
+
     def toggle_theme(self) -> None:
         """Toggle between dark and light theme."""
         # This would require more implementation for full theme switching
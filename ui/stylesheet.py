@@ -99,6 +99,16 @@ QPushButton#exportButton:hover {
     background-color: #7c3aed;
 }
 
+/* Import Button */
+QPushButton#importButton {
+    background-color: #0ea5e9;
+    border: 1px solid #0284c7;
+}
+
+QPushButton#importButton:hover {
+    background-color: #0284c7;
+}
+
 /* Input Fields */
 QLineEdit, QTextEdit {
     background-color: #1a1f2e;
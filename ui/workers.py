@@ -0,0 +1,71 @@
+"""
+Background workers for long-running data operations.
+"""
+
+import threading
+from PySide6.QtCore import QObject, Signal, Slot
+from data.database import DatabaseManager
+from modules.importer import ExpenseImporter
+
+
+class CsvExportWorker(QObject):
+    """Streams an expense CSV export off the GUI thread."""
+
+    progress = Signal(int)
+    finished = Signal(int)
+    cancelled = Signal()
+    failed = Signal(str)
+
+    def __init__(self, db_manager: DatabaseManager, file_path: str, **export_options):
+        """Initialize export worker."""
+        super().__init__()
+        self.db_manager = db_manager
+        self.file_path = file_path
+        self.export_options = export_options
+        self._cancel_event = threading.Event()
+
+    def cancel(self) -> None:
+        """Ask the export to stop after the current chunk."""
+        self._cancel_event.set()
+
+    @Slot()
+    def run(self) -> None:
+        """Run the export and report the outcome through signals."""
+        try:
+            written = self.db_manager.stream_expenses_csv(
+                self.file_path,
+                progress=self.progress.emit,
+                should_cancel=self._cancel_event.is_set,
+                **self.export_options
+            )
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        if written is None:
+            self.cancelled.emit()
+        else:
+            self.finished.emit(written)
+
+
+class ImportWorker(QObject):
+    """Runs a bulk transaction import off the GUI thread."""
+
+    progress = Signal(int)
+    finished = Signal(dict)
+    failed = Signal(str)
+
+    def __init__(self, importer: ExpenseImporter, file_path: str):
+        """Initialize import worker."""
+        super().__init__()
+        self.importer = importer
+        self.file_path = file_path
+
+    @Slot()
+    def run(self) -> None:
+        """Run the import and report the summary through signals."""
+        try:
+            summary = self.importer.import_file(self.file_path, progress=self.progress.emit)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.finished.emit(summary)